@@ -1,27 +1,61 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy 
-from flask_migrate import Migrate
+import click
+from flask import Blueprint, Flask, jsonify, request
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from datetime import datetime
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import HTTPException
 from validations import  validate_user_data, validate_project_data
 from models import db, User, Project, Comment, ProjectSkill, Skill, Bookmark
-import os
+from bulk import bulk_insert, bulk_update, bulk_delete, delete_children, is_unique_violation, read_batch, valid_ids
+from cache import cache
+from changes import changes
+from compression import compression
+from config import Config, use_sqlite_pragmas
+from counters import bump, reconcile
+from feeds import bookmark_feeds
+from conditional import conditional
+from events import events
+from filters import project_filters
+from metrics import metrics
+from pagination import paginate
+from representations import output_json
+from streaming import stream_export
+from timeline import timeline_page
+from write_behind import bookmark_buffer, missing_parent
+from project_detail import load_project_detail
+from search import search
+from schemas import user_schema, project_schema, bookmark_schema, comment_schema, skill_schema, project_skill_schema
+
+# Resources live on a blueprint so every create_app() call gets its own app
+# around the same routes; cli_group=None keeps commands at the top level
+bp = Blueprint('api', __name__, cli_group=None)
+api = Api(bp)
+api.representation('application/json')(output_json)
+
+@bp.route('/')
+def index():
+    return jsonify({"message": "Welcome to the portfoliopro API"})
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URI')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+@bp.route('/cache/stats')
+def cache_stats():
+    return jsonify(cache.stats())
 
-db.init_app(app)
-migrate = Migrate(app, db)
-api = Api(app)
-cors = CORS(app)
+@bp.route('/metrics')
+def prometheus_metrics():
+    return metrics.render()
 
-@app.route('/')
-def index():
-    return jsonify({"message": "Welcome to the portfoliopro API"})
+@bp.route('/projects/<int:project_id>/events')
+def project_events(project_id):
+    # SSE: new comments and bookmark counts; holds a worker thread per stream,
+    # the async app serves the same stream without one
+    if db.session.query(Project.id).filter(Project.id == project_id).first() is None:
+        return jsonify({"message": "Project not found"}), 404
+    return events.stream(project_id)
 
 class UserData(Resource): 
+    method_decorators = {'get': [cache.cached('users', 'user_id'), conditional(User, 'user_id', item_tables=('projects',))]}
+
     def get(self, user_id=None):
         if user_id:
             # Get a specific user
@@ -33,12 +67,12 @@ class UserData(Resource):
                 "username": user.username, 
                 "email": user.email,
                 "role": user.role,
-                "projects": [{"id": p.id, "title": p.title} for p in user.project]
+                "projects": [{"id": p.id, "title": p.title} for p in user.projects]
             }, 200
          
         # Get all users
-        users = User.query.all()
-        return [{"id": user.id, "username": user.username, "email": user.email, "role": user.role} for user in users], 200
+        query, serialize = user_schema.listing("id", "username", "email", "role")
+        return paginate(query, User, serialize), 200
 
     def post(self):
         # Create a new user
@@ -49,11 +83,13 @@ class UserData(Resource):
 
         new_user = User(username=data['username'], email=data['email'], role=data['role'])  
         db.session.add(new_user)
+        changes.record('users', 'created', new_user)
         try:
             db.session.commit()
         except Exception as e:
             db.session.rollback()
             return jsonify({"message": "Username or email exists"}), 400
+        cache.invalidate('users')
         return jsonify({"message": f"User {new_user.username} created"}), 201 
 
     def put(self, user_id):
@@ -71,7 +107,9 @@ class UserData(Resource):
             user.role = data["role"]
 
         try:
+            changes.record('users', 'updated', user_id)
             db.session.commit()
+            cache.invalidate('users', user_id)
             return {"message": f"User {user.username} updated"}, 200
         except Exception as e:
             db.session.rollback()
@@ -85,13 +123,25 @@ class UserData(Resource):
 
         try:
             db.session.delete(user)
+            changes.record('users', 'deleted', user_id)
             db.session.commit()
+            cache.invalidate('users', user_id)
+            bookmark_feeds.forget_users(user_id)
             return {"message": f"User {user.username} deleted"}, 200
         except Exception as e:
             db.session.rollback()
             return {"message": "Error deleting user"}, 500
 
+def skill_link_ids(criterion):
+    # ids of the project_skills rows the ORM removes without loading them
+    return [row.id for row in db.session.query(ProjectSkill.id).filter(criterion)]
+
+# Listed projects carry the counters, and ?skill= reads the skill links
+PROJECT_LIST_TABLES = ('bookmarks', 'comments', 'project_skills', 'skills')
+
 class ProjectData(Resource):
+    method_decorators = {'get': [cache.cached('projects', 'project_id'), conditional(Project, 'project_id', list_tables=PROJECT_LIST_TABLES)]}
+
     def get(self, project_id=None):
         if project_id:
             # Get a specific project
@@ -104,11 +154,14 @@ class ProjectData(Resource):
             "description": project.description,
             "image": project.image,
             "user_id": project.user_id,
+            "bookmark_count": project.bookmark_count,
+            "comment_count": project.comment_count,
         }, 200
         else:
-            # Get all projects
-            projects = Project.query.all()
-            return [{"id": project.id, "title": project.title, "description": project.description} for project in projects], 200
+            # Get all projects, narrowed and ordered by the declared project filters
+            query, serialize = project_schema.listing("id", "title", "description", "bookmark_count", "comment_count")
+            query = query.filter(*project_filters.criteria())
+            return paginate(query, Project, serialize, project_filters.order()), 200
         
     def post(self):
         # Create a new project
@@ -119,11 +172,14 @@ class ProjectData(Resource):
         
         new_project = Project(title=data["title"], description=data["description"],image=data["image"] ,user_id=data["user_id"])
         db.session.add(new_project)
+        changes.record('projects', 'created', new_project)
         try:
             db.session.commit()
         except Exception as e:
             db.session.rollback()
             return {"message": "Error creating project"}, 500 
+        cache.invalidate('projects')
+        cache.invalidate('users', new_project.user_id)
         return {"message": f"Project {new_project.title} created"}, 201
 
     def put(self, project_id):
@@ -133,12 +189,17 @@ class ProjectData(Resource):
             return {"message": "Project not found"}, 404
         
         data = request.json
+        previous_user_id = project.user_id
         project.title = data.get("title", project.title)
         project.description = data.get("description", project.description)
         project.image = data.get("image", project.image)
         project.user_id = data.get("user_id", project.user_id)
         try:
+            changes.record('projects', 'updated', project_id)
             db.session.commit()
+            cache.invalidate('projects', project_id)
+            cache.invalidate('users', previous_user_id, project.user_id)
+            bookmark_feeds.forget_projects(project_id)
             return {"message": f"Project {project.title} updated"}, 200
         except Exception as e:
             db.session.rollback()
@@ -151,43 +212,62 @@ class ProjectData(Resource):
             return {"message": "Project not found"}, 404
         
         try:
+            # Comments go with the project (delete-orphan) and its skill links
+            # through Project.skills, so they are logged too
+            changes.record('comments', 'deleted', *[comment.id for comment in project.comments])
+            changes.record('project_skills', 'deleted', *skill_link_ids(ProjectSkill.project_id == project_id))
+            changes.record('projects', 'deleted', project_id)
             db.session.delete(project)
             db.session.commit()
+            cache.invalidate('projects', project_id)
+            cache.invalidate('users', project.user_id)
+            bookmark_feeds.forget_projects(project_id)
             return {"message": f"Project {project.title} deleted"}, 200
         except Exception as e:
             db.session.rollback()
             return {"message": "Error deleting project"}, 500
 
+def delete_bookmark(user_id, project_id):
+    # Delete the bookmark in one statement, the row count tells us if it existed
+    if bookmark_buffer.enabled:
+        return bookmark_buffer.toggle(user_id, project_id, False)
+    try:
+        deleted = db.session.scalars(delete(Bookmark).where(Bookmark.user_id == user_id, Bookmark.project_id == project_id)
+                                     .returning(Bookmark.id)).all()
+        if not deleted:
+            db.session.rollback()
+            return {"message": "Bookmark not found"}, 404
+        bookmark_count = bump(Project.bookmark_count, project_id, -len(deleted))
+        changes.record('bookmarks', 'deleted', *deleted)
+        db.session.commit()
+        cache.invalidate('projects', project_id)
+        bookmark_feeds.removed(user_id, project_id)
+        events.bookmarks_changed(project_id, bookmark_count)
+        return {"message": f"Bookmark for project {project_id} by user {user_id} deleted"}, 200
+    except Exception as e:
+        db.session.rollback()
+        return {"message": "Error deleting bookmark"}, 500
+
 class BookmarkData(Resource):
+    # settled is outermost, so buffered toggles are written before the validators are read
+    method_decorators = {'get': [conditional(Bookmark, list_tables=('projects',)), bookmark_buffer.settled]}
+
     def get(self):
         # Fetch all bookmarks of a specific user
         user_id = request.args.get('user_id') 
         if user_id:
-            bookmarks = Bookmark.query.filter_by(user_id=user_id).all()
-            if not bookmarks:
+            query, serialize = bookmark_schema.listing("id", "project_id", "project_title", "created_at")
+            page = paginate(query.filter(Bookmark.user_id == user_id), Bookmark, serialize)
+            if not page["items"]:
                 return {"message": "No bookmarks found for this user"}, 404
-            return [
-                {
-                    "id": bookmark.id,
-                    "project_id": bookmark.project_id,
-                    "project_title": bookmark.project.title if bookmark.project else None,
-                    "created_at": bookmark.created_at.isoformat(),
-                }
-                for bookmark in bookmarks
-            ], 200
-
-        # Fetch all bookmarks
-        bookmarks = Bookmark.query.all()
-        return [
-            {
-                "id": bookmark.id,
-                "user_id": bookmark.user_id,
-                "project_id": bookmark.project_id,
-                "project_title": bookmark.project.title if bookmark.project else None,
-                "created_at": bookmark.created_at.isoformat(),
-            }
-            for bookmark in bookmarks
-        ], 200
+            return page, 200
+
+        # Fetch all bookmarks, streamed when an export format is requested
+        query, serialize = bookmark_schema.listing("id", "user_id", "project_id", "project_title", "created_at")
+        export_format = request.args.get('format')
+        if export_format:
+            return stream_export(query, Bookmark, serialize, export_format)
+        return paginate(query, Bookmark, serialize), 200
     
     def post(self):
         data = request.json
@@ -199,35 +279,35 @@ class BookmarkData(Resource):
             return {"message": "'user_id', 'project_id', and 'action' are required"}, 400
 
         if action == "bookmark":
-            # Check if the bookmark already exists
-            existing_bookmark = Bookmark.query.filter_by(user_id=user_id, project_id=project_id).first()
-            if existing_bookmark:
-                return {"message": "This project is already bookmarked by the user"}, 400
-
-            # Create a new bookmark
+            if bookmark_buffer.enabled:
+                return bookmark_buffer.toggle(user_id, project_id, True)
+            missing = missing_parent(user_id, project_id)
+            if missing is not None:
+                return missing
+            # Create a new bookmark, unique_user_bookmark rejects duplicates
             new_bookmark = Bookmark(user_id=user_id, project_id=project_id)
             db.session.add(new_bookmark)
             try:
+                db.session.flush()
+                bookmark_id = new_bookmark.id
+                bookmark_count = bump(Project.bookmark_count, project_id, 1)
+                changes.record('bookmarks', 'created', new_bookmark)
                 db.session.commit()
+                cache.invalidate('projects', project_id)
+                bookmark_feeds.added(user_id, bookmark_id)
+                events.bookmarks_changed(project_id, bookmark_count)
                 return {"message": f"Project {project_id} bookmarked by user {user_id}"}, 201
+            except IntegrityError as e:
+                db.session.rollback()
+                if is_unique_violation(e):
+                    return {"message": "This project is already bookmarked by the user"}, 400
+                return {"message": "Error creating bookmark"}, 500
             except Exception as e:
                 db.session.rollback()
                 return {"message": "Error creating bookmark"}, 500
 
         elif action == "unbookmark":
-            # Check if the bookmark exists
-            bookmark = Bookmark.query.filter_by(user_id=user_id, project_id=project_id).first()
-            if not bookmark:
-                return {"message": "Bookmark not found"}, 404
-
-            # Delete the bookmark
-            try:
-                db.session.delete(bookmark)
-                db.session.commit()
-                return {"message": f"Bookmark for project {project_id} by user {user_id} deleted"}, 200
-            except Exception as e:
-                db.session.rollback()
-                return {"message": "Error deleting bookmark"}, 500
+            return delete_bookmark(user_id, project_id)
 
         else:
             return {"message": "Invalid action"}, 400
@@ -241,21 +321,23 @@ class BookmarkData(Resource):
         if not user_id or not project_id:
             return {"message": "Both 'user_id' and 'project_id' are required"}, 400
 
-        # Check if the bookmark exists
-        bookmark = Bookmark.query.filter_by(user_id=user_id, project_id=project_id).first()
-        if not bookmark:
-            return {"message": "Bookmark not found"}, 404
+        return delete_bookmark(user_id, project_id)
+
+
+class BookmarkFeed(Resource):
+    method_decorators = {'get': [conditional(Bookmark, list_tables=('projects',)), bookmark_buffer.settled]}
+
+    def get(self, user_id):
+        # A user's saved projects, newest first, with the project title and image
+        page = bookmark_feeds.page(user_id)
+        if not page["items"]:
+            return {"message": "No bookmarks found for this user"}, 404
+        return page, 200
+
 
-        # Delete the bookmark
-        try:
-            db.session.delete(bookmark)
-            db.session.commit()
-            return {"message": f"Bookmark for project {project_id} by user {user_id} deleted"}, 200
-        except Exception as e:
-            db.session.rollback()
-            return {"message": "Error deleting bookmark"}, 500
-        
 class CommentData(Resource):
+    method_decorators = {'get': [conditional(Comment)]}
+
     def get(self):
         # Fetch all comments or comments for a specific project or user
         project_id = request.args.get('project_id')  # Optional query parameter
@@ -263,49 +345,26 @@ class CommentData(Resource):
 
         if project_id:
             # Get comments for a specific project
-            comments = Comment.query.filter_by(project_id=project_id).all()
-            if not comments:
+            query, serialize = comment_schema.listing("id", "user_id", "content", "created_at", "updated_at")
+            page = paginate(query.filter(Comment.project_id == project_id), Comment, serialize)
+            if not page["items"]:
                 return {"message": "No comments found for this project"}, 404
-            return [
-                {
-                    "id": comment.id,
-                    "user_id": comment.user_id,
-                    "content": comment.content,
-                    "created_at": comment.created_at.isoformat(),
-                    "updated_at": comment.updated_at.isoformat(),
-                }
-                for comment in comments
-            ], 200
+            return page, 200
 
         elif user_id:
             # Get comments by a specific user
-            comments = Comment.query.filter_by(user_id=user_id).all()
-            if not comments:
+            query, serialize = comment_schema.listing("id", "project_id", "content", "created_at", "updated_at")
+            page = paginate(query.filter(Comment.user_id == user_id), Comment, serialize)
+            if not page["items"]:
                 return {"message": "No comments found for this user"}, 404
-            return [
-                {
-                    "id": comment.id,
-                    "project_id": comment.project_id,
-                    "content": comment.content,
-                    "created_at": comment.created_at.isoformat(),
-                    "updated_at": comment.updated_at.isoformat(),
-                }
-                for comment in comments
-            ], 200
-
-        # Fetch all comments
-        comments = Comment.query.all()
-        return [
-            {
-                "id": comment.id,
-                "user_id": comment.user_id,
-                "project_id": comment.project_id,
-                "content": comment.content,
-                "created_at": comment.created_at.isoformat(),
-                "updated_at": comment.updated_at.isoformat(),
-            }
-            for comment in comments
-        ], 200
+            return page, 200
+
+        # Fetch all comments, streamed when an export format is requested
+        query, serialize = comment_schema.listing("id", "user_id", "project_id", "content", "created_at", "updated_at")
+        export_format = request.args.get('format')
+        if export_format:
+            return stream_export(query, Comment, serialize, export_format)
+        return paginate(query, Comment, serialize), 200
 
     def post(self):
         # Create a new comment
@@ -325,7 +384,11 @@ class CommentData(Resource):
         db.session.add(new_comment)
 
         try:
+            bump(Project.comment_count, project_id, 1)
+            changes.record('comments', 'created', new_comment)
             db.session.commit()
+            cache.invalidate('projects', project_id)
+            events.comment_added(project_id, new_comment)
             return {"message": f"Comment added to project {project_id} by user {user_id}"}, 201
         except Exception as e:
             db.session.rollback()
@@ -352,14 +415,28 @@ class CommentData(Resource):
         # Delete the comment
         try:
             db.session.delete(comment)
+            bump(Project.comment_count, project_id, -1)
+            changes.record('comments', 'deleted', comment.id)
             db.session.commit()
+            cache.invalidate('projects', project_id)
             return {"message": f"Comment for project {project_id} by user {user_id} deleted"}, 200
         except Exception as e:
             db.session.rollback()
             return {"message": "Error deleting comment"}, 500
         
 
+class ProjectComments(Resource):
+    method_decorators = {'get': [conditional(Comment, list_tables=('users',))]}
+
+    def get(self, project_id):
+        # A project's comments with usernames, newest first or ?since= for polling
+        if db.session.query(Project.id).filter(Project.id == project_id).first() is None:
+            return {"message": "Project not found"}, 404
+        return timeline_page(project_id), 200
+
+
 class SkillData(Resource):
+    method_decorators = {'get': [cache.cached('skills', 'skill_id'), conditional(Skill, 'skill_id')]}
 
     def get(self, skill_id=None):
         # Fetch a specific skill or all skills
@@ -375,17 +452,8 @@ class SkillData(Resource):
                 "updated_at": skill.updated_at,
             }, 200
         else:
-            skills = Skill.query.all()
-            return [
-                {
-                    "id": skill.id,
-                    "name": skill.name,
-                    "details": skill.details,
-                    "created_at": skill.created_at.isoformat(),
-                    "updated_at": skill.updated_at.isoformat(),
-                }
-                for skill in skills
-            ], 200
+            query, serialize = skill_schema.listing("id", "name", "details", "created_at", "updated_at")
+            return paginate(query, Skill, serialize), 200
 
     def post(self):
         # Create a new skill
@@ -400,9 +468,11 @@ class SkillData(Resource):
         # Create a new skill
         new_skill = Skill(name=name, details=details)
         db.session.add(new_skill)
+        changes.record('skills', 'created', new_skill)
 
         try:
             db.session.commit()
+            cache.invalidate('skills')
             return {"message": f"Skill '{new_skill.name}' created"}, 201
         except Exception as e:
             db.session.rollback()
@@ -421,7 +491,11 @@ class SkillData(Resource):
             skill.details = data['details']
 
         try:
+            changes.record('skills', 'updated', skill_id)
             db.session.commit()
+            cache.invalidate('skills', skill_id)
+            # A renamed skill changes what /projects?skill=<name> matches
+            cache.invalidate('projects')
             return {"message": f"Skill '{skill.name}' updated"}, 200
         except Exception as e:
             db.session.rollback()
@@ -434,15 +508,21 @@ class SkillData(Resource):
             return {"message": "Skill not found"}, 404
 
         try:
+            # The links to the skill are deleted through Project.skills
+            changes.record('project_skills', 'deleted', *skill_link_ids(ProjectSkill.skill_id == skill_id))
             db.session.delete(skill)
+            changes.record('skills', 'deleted', skill_id)
             db.session.commit()
+            cache.invalidate('skills', skill_id)
+            cache.invalidate('projects')
             return {"message": f"Skill '{skill.name}' deleted"}, 200
         except Exception as e:
             db.session.rollback()
             return {"message": "Error deleting skill"}, 500
 
 class ProjectSkillData(Resource):
-    
+    method_decorators = {'get': [conditional(ProjectSkill, list_tables=('projects', 'skills'))]}
+
     # Add a skill to a project (create a new project-skill relationship)
     def get(self):
         project_id = request.args.get('project_id')
@@ -450,46 +530,23 @@ class ProjectSkillData(Resource):
 
         if project_id:
             # Get all skills for a specific project
-            project_skills = ProjectSkill.query.filter_by(project_id=project_id).all()
-            if not project_skills:
+            query, serialize = project_skill_schema.listing("id", "project_id", "skill_id", "skill_name")
+            page = paginate(query.filter(ProjectSkill.project_id == project_id), ProjectSkill, serialize)
+            if not page["items"]:
                 return {"message": "No skills found for this project"}, 404
-            return [
-                {
-                    "id": project_skill.id,
-                    "project_id": project_skill.project_id,
-                    "skill_id": project_skill.skill_id,
-                    "skill_name": project_skill.skill.name,  # Access skill name dynamically
-                }
-                for project_skill in project_skills
-            ], 200
+            return page, 200
         
         if skill_id:
             # Get all projects for a specific skill
-            project_skills = ProjectSkill.query.filter_by(skill_id=skill_id).all()
-            if not project_skills:
+            query, serialize = project_skill_schema.listing("id", "project_id", "skill_id", "project_title")
+            page = paginate(query.filter(ProjectSkill.skill_id == skill_id), ProjectSkill, serialize)
+            if not page["items"]:
                 return {"message": "No projects found for this skill"}, 404
-            return [
-                {
-                    "id": project_skill.id,
-                    "project_id": project_skill.project_id,
-                    "skill_id": project_skill.skill_id,
-                    "project_title": project_skill.project.title,  # Access project title dynamically
-                }
-                for project_skill in project_skills
-            ], 200
+            return page, 200
 
         # Get all project-skill relationships
-        project_skills = ProjectSkill.query.all()
-        return [
-            {
-                "id": project_skill.id,
-                "project_id": project_skill.project_id,
-                "skill_id": project_skill.skill_id,
-                "project_title": project_skill.project.title,  # Access project title dynamically
-                "skill_name": project_skill.skill.name,  # Access skill name dynamically
-            }
-            for project_skill in project_skills
-        ], 200
+        query, serialize = project_skill_schema.listing("id", "project_id", "skill_id", "project_title", "skill_name")
+        return paginate(query, ProjectSkill, serialize), 200
 
     def post(self):
         data = request.json
@@ -506,12 +563,14 @@ class ProjectSkillData(Resource):
         
         new_project_skill = ProjectSkill(project_id=project_id, skill_id=skill_id)
         db.session.add(new_project_skill)
+        changes.record('project_skills', 'created', new_project_skill)
         try:
             db.session.commit()
         except Exception as e:
             db.session.rollback()
             return {"message": f"Error adding skill to project: {str(e)}"}, 500
-        
+        # /projects?skill= listings are cached
+        cache.invalidate('projects')
         return {"message": f"Skill added to project successfully!"}, 201
 
     
@@ -524,7 +583,9 @@ class ProjectSkillData(Resource):
         
         try:
             db.session.delete(project_skill)
+            changes.record('project_skills', 'deleted', project_skill_id)
             db.session.commit()
+            cache.invalidate('projects')
             return {"message": f"Skill removed from project successfully!"}, 200
         except Exception as e:
             db.session.rollback()
@@ -533,14 +594,265 @@ class ProjectSkillData(Resource):
 
 
 
+class ProjectFullData(Resource):
+    def get(self, project_id):
+        # Project, owner, skills, first page of comments and counts in one response
+        detail = load_project_detail(project_id)
+        if detail is None:
+            return {"message": "Project not found"}, 404
+        return detail, 200
+
+class SearchData(Resource):
+    def get(self):
+        # Ranked full-text search over projects, skills and comments
+        return search(request.args.get('q'), request.args.get('type')), 200
+
+class ChangeFeed(Resource):
+    def get(self):
+        # Writes after ?since=<seq> in commit order; ?wait=<seconds> long-polls for the next one
+        return changes.page(request.args), 200
+
+PROJECT_FIELDS = ("title", "description", "image", "user_id")
+SKILL_FIELDS = ("name", "details")
+PROJECT_SKILL_FIELDS = ("project_id", "skill_id")
+
+class ProjectBulkData(Resource):
+    # Create, update or delete many projects in a single transaction
+
+    def post(self):
+        items, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            results = bulk_insert(Project, items, ("title", "description", "user_id"), PROJECT_FIELDS, ("title",))
+            changes.record_results('projects', results)
+            db.session.commit()
+        except HTTPException:
+            # abort() from bulk.py, e.g. 501 on a database without upserts
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error creating projects"}, 500
+        cache.invalidate('projects')
+        cache.invalidate('users', *{item.get("user_id") for item in items if isinstance(item, dict)})
+        return {"results": results}, 200
+
+    def put(self):
+        items, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            # Both the previous and the new owners embed these projects
+            ids = [item.get("id") for item in items if isinstance(item, dict)]
+            user_ids = {row.user_id for row in db.session.query(Project.user_id).filter(Project.id.in_(valid_ids(ids)))}
+            user_ids |= {item["user_id"] for item in items if isinstance(item, dict) and item.get("user_id")}
+            results = bulk_update(Project, items, PROJECT_FIELDS)
+            changes.record_results('projects', results)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error updating projects"}, 500
+        cache.invalidate('projects', *[result["id"] for result in results if result["status"] == "updated"])
+        cache.invalidate('users', *user_ids)
+        bookmark_feeds.forget_projects(*[result["id"] for result in results if result["status"] == "updated"])
+        return {"results": results}, 200
+
+    def delete(self):
+        ids, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            user_ids = [row.user_id for row in db.session.query(Project.user_id).filter(Project.id.in_(valid_ids(ids)))]
+            # Comments and skill links go with their project, as in ProjectData.delete,
+            # and so do its bookmarks; nothing is left pointing at a deleted id
+            comment_ids = delete_children(Comment.project_id, ids)
+            link_ids = delete_children(ProjectSkill.project_id, ids)
+            bookmark_ids = delete_children(Bookmark.project_id, ids)
+            results = bulk_delete(Project, ids)
+            changes.record('comments', 'deleted', *comment_ids)
+            changes.record('project_skills', 'deleted', *link_ids)
+            changes.record('bookmarks', 'deleted', *bookmark_ids)
+            changes.record_results('projects', results)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error deleting projects"}, 500
+        cache.invalidate('projects', *valid_ids(ids))
+        cache.invalidate('users', *user_ids)
+        bookmark_feeds.forget_projects(*valid_ids(ids))
+        return {"results": results}, 200
+
+class SkillBulkData(Resource):
+    # Create, update or delete many skills in a single transaction
+
+    def post(self):
+        items, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            results = bulk_insert(Skill, items, SKILL_FIELDS, SKILL_FIELDS, ("name",))
+            changes.record_results('skills', results)
+            db.session.commit()
+        except HTTPException:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error creating skills"}, 500
+        cache.invalidate('skills')
+        return {"results": results}, 200
+
+    def put(self):
+        items, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            results = bulk_update(Skill, items, SKILL_FIELDS)
+            changes.record_results('skills', results)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error updating skills"}, 500
+        cache.invalidate('skills', *[result["id"] for result in results if result["status"] == "updated"])
+        cache.invalidate('projects')
+        return {"results": results}, 200
+
+    def delete(self):
+        ids, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            # Links to the skills go first, as they do through Project.skills in SkillData.delete
+            link_ids = delete_children(ProjectSkill.skill_id, ids)
+            results = bulk_delete(Skill, ids)
+            changes.record('project_skills', 'deleted', *link_ids)
+            changes.record_results('skills', results)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error deleting skills"}, 500
+        cache.invalidate('skills', *valid_ids(ids))
+        cache.invalidate('projects')
+        return {"results": results}, 200
+
+class ProjectSkillBulkData(Resource):
+    # Link or unlink many project/skill pairs in a single transaction
+
+    def post(self):
+        items, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            results = bulk_insert(ProjectSkill, items, PROJECT_SKILL_FIELDS, PROJECT_SKILL_FIELDS, PROJECT_SKILL_FIELDS)
+            changes.record_results('project_skills', results)
+            db.session.commit()
+        except HTTPException:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error adding skills to projects"}, 500
+        cache.invalidate('projects')
+        return {"results": results}, 200
+
+    def delete(self):
+        ids, error = read_batch(request.json)
+        if error:
+            return error
+        try:
+            results = bulk_delete(ProjectSkill, ids)
+            changes.record_results('project_skills', results)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"message": "Error removing skills from projects"}, 500
+        cache.invalidate('projects')
+        return {"results": results}, 200
+
+
+@bp.cli.command('reconcile-counters')
+def reconcile_counters():
+    """Recount bookmark_count and comment_count on every project and repair drift."""
+    repaired = reconcile()
+    cache.invalidate('projects')
+    print(f"Repaired counters on {repaired} project(s)")
+
+@bp.cli.command('seed')
+@click.option('--users', default=50, show_default=True)
+@click.option('--projects', default=100, show_default=True)
+@click.option('--skills', default=20, show_default=True)
+@click.option('--comments', default=500, show_default=True)
+@click.option('--bookmarks', default=200, show_default=True)
+@click.option('--seed', 'random_seed', default=42, show_default=True, help='Faker/random seed.')
+@click.option('--chunk-size', default=5000, show_default=True, help='Rows per INSERT and per transaction.')
+@click.option('--truncate', is_flag=True, help='Empty all six tables first.')
+def seed_command(users, projects, skills, comments, bookmarks, random_seed, chunk_size, truncate):
+    """Fill every table with generated data in chunked bulk inserts."""
+    import time
+    from seed import seed
+    started = time.perf_counter()
+    counts = seed(users=users, projects=projects, skills=skills, comments=comments, bookmarks=bookmarks,
+                  seed=random_seed, chunk_size=chunk_size, reset=truncate)
+    for resource in ('users', 'projects', 'skills'):
+        cache.invalidate(resource)
+    bookmark_feeds.clear()
+    print(f"Inserted {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s: "
+          + ', '.join(f"{table}={count}" for table, count in counts.items()))
+
+@bp.cli.command('check-indexes')
+def check_indexes():
+    """Fail if any hot filter in the API falls back to a full table scan."""
+    from query_plans import check_query_plans
+    failed = False
+    for name, (ok, plan) in check_query_plans().items():
+        print(f"{'ok  ' if ok else 'SCAN'} {name}: {' | '.join(plan)}")
+        failed = failed or not ok
+    if failed:
+        raise SystemExit(1)
+
 api.add_resource(UserData, '/user', '/user/<int:user_id>')
 api.add_resource(ProjectData, '/projects', '/projects/<int:project_id>')
 api.add_resource(BookmarkData, '/bookmark')
+api.add_resource(BookmarkFeed, '/user/<int:user_id>/bookmarks')
 api.add_resource(CommentData, '/comment')
 api.add_resource(SkillData, '/skill', '/skill/<int:skill_id>')
 api.add_resource(ProjectSkillData, '/projectskill', '/projectskill/<int:project_skill_id>')
+api.add_resource(ProjectFullData, '/projects/<int:project_id>/full')
+api.add_resource(ProjectComments, '/projects/<int:project_id>/comments')
+api.add_resource(SearchData, '/search')
+api.add_resource(ChangeFeed, '/changes')
+api.add_resource(ProjectBulkData, '/projects/bulk')
+api.add_resource(SkillBulkData, '/skill/bulk')
+api.add_resource(ProjectSkillBulkData, '/projectskill/bulk')
+
+def create_app(config=Config):
+    app = Flask(__name__)
+    app.config.from_object(config)
+
+    db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            use_sqlite_pragmas(db.engine, app.config)
+    cache.init_app(app)
+    metrics.init_app(app)
+    compression.init_app(app)
+    bookmark_feeds.init_app(app)
+    changes.init_app(app)
+    events.init_app(app)
+    bookmark_buffer.init_app(app)
+    CORS(app)
+    app.register_blueprint(bp)
+
+    # Alembic is only needed by `flask db ...`, so web workers and tests
+    # skip importing it; the flask CLI always builds the app inside a click context
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    return app
 
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         db.create_all()
     app.run(debug=True, port=5555)
@@ -0,0 +1,3 @@
+from async_api import create_async_app
+
+app = create_async_app()
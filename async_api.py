@@ -0,0 +1,164 @@
+import os
+from quart import Blueprint, Quart, Response, current_app, request
+from quart.json.provider import DefaultJSONProvider
+from quart.views import MethodView
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+from config import Config, use_sqlite_pragmas
+from events import STREAM_HEADERS, async_frames, channel_name, make_broker
+from filters import project_filters
+from models import Project, Skill, Comment
+from pagination import build_page, page_statement
+from representations import dumps
+from schemas import project_schema, skill_schema, comment_schema
+
+# Read-only async serving mode: the project, skill and comment reads from
+# app.py on an AsyncSession, so a few processes can keep thousands of slow
+# connections open while their queries are in flight. Writes stay on the
+# Flask-RESTful app.
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+INSTANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+PROJECT_DETAIL_FIELDS = ("id", "title", "description", "image", "user_id", "bookmark_count", "comment_count")
+
+async_api = Blueprint('async_api', __name__)
+
+
+class JSONProvider(DefaultJSONProvider):
+    # Same encoder and datetime format as the Flask API
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode()
+
+
+def async_database_uri(uri):
+    # Same database as the Flask app with the async driver swapped in;
+    # relative SQLite paths resolve against instance/ like Flask-SQLAlchemy's
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == 'sqlite' and url.database and url.database != ':memory:' and not os.path.isabs(url.database):
+        url = url.set(database=os.path.join(INSTANCE_DIR, url.database))
+    return url
+
+
+def session():
+    return current_app.extensions['async_session']()
+
+
+async def paginate(db_session, statement, model, serialize, order=None):
+    statement, order, limit = page_statement(statement, model, order, request.args)
+    rows = (await db_session.execute(statement)).all()
+    return build_page(rows, order, limit, serialize)
+
+
+@async_api.app_errorhandler(HTTPException)
+def handle_http_error(error):
+    # flask_restful.abort() from the shared helpers carries its message in data
+    message = getattr(error, 'data', {}).get('message', error.description)
+    return {"message": message}, error.code
+
+
+@async_api.route('/')
+async def index():
+    return {"message": "Welcome to the portfoliopro async read API"}
+
+
+class ProjectView(MethodView):
+    async def get(self, project_id=None):
+        async with session() as db_session:
+            if project_id:
+                statement = project_schema.select(*PROJECT_DETAIL_FIELDS).where(Project.id == project_id)
+                row = (await db_session.execute(statement)).first()
+                if row is None:
+                    return {"message": "Project not found"}, 404
+                return project_schema.serializer(*PROJECT_DETAIL_FIELDS)(row), 200
+
+            statement = project_schema.select("id", "title", "description", "bookmark_count", "comment_count")
+            statement = statement.where(*project_filters.criteria(request.args))
+            serialize = project_schema.serializer("id", "title", "description", "bookmark_count", "comment_count")
+            return await paginate(db_session, statement, Project, serialize, project_filters.order(request.args)), 200
+
+
+class SkillView(MethodView):
+    async def get(self, skill_id=None):
+        fields = ("id", "name", "details", "created_at", "updated_at")
+        async with session() as db_session:
+            if skill_id:
+                row = (await db_session.execute(skill_schema.select(*fields).where(Skill.id == skill_id))).first()
+                if row is None:
+                    return {"message": "Skill not found"}, 404
+                return skill_schema.serializer(*fields)(row), 200
+            return await paginate(db_session, skill_schema.select(*fields), Skill, skill_schema.serializer(*fields)), 200
+
+
+class CommentView(MethodView):
+    async def get(self):
+        project_id = request.args.get('project_id')
+        user_id = request.args.get('user_id')
+        async with session() as db_session:
+            if project_id:
+                fields = ("id", "user_id", "content", "created_at", "updated_at")
+                statement = comment_schema.select(*fields).where(Comment.project_id == project_id)
+                page = await paginate(db_session, statement, Comment, comment_schema.serializer(*fields))
+                if not page["items"]:
+                    return {"message": "No comments found for this project"}, 404
+                return page, 200
+
+            if user_id:
+                fields = ("id", "project_id", "content", "created_at", "updated_at")
+                statement = comment_schema.select(*fields).where(Comment.user_id == user_id)
+                page = await paginate(db_session, statement, Comment, comment_schema.serializer(*fields))
+                if not page["items"]:
+                    return {"message": "No comments found for this user"}, 404
+                return page, 200
+
+            fields = ("id", "user_id", "project_id", "content", "created_at", "updated_at")
+            return await paginate(db_session, comment_schema.select(*fields), Comment, comment_schema.serializer(*fields)), 200
+
+
+@async_api.route('/projects/<int:project_id>/events')
+async def project_events(project_id):
+    # Same SSE stream as the Flask app, one coroutine per connection; needs
+    # EVENTS_BACKEND=redis since the writes happen in the Flask workers
+    async with session() as db_session:
+        if (await db_session.execute(project_schema.select("id").where(Project.id == project_id))).first() is None:
+            return {"message": "Project not found"}, 404
+    config = current_app.config
+    chunks = async_frames(current_app.extensions['events'], channel_name(project_id),
+                          float(config['EVENTS_HEARTBEAT']), int(config['EVENTS_QUEUE_SIZE']))
+    response = Response(chunks, mimetype='text/event-stream', headers=STREAM_HEADERS)
+    response.timeout = None  # no RESPONSE_TIMEOUT for a stream that stays open
+    return response
+
+
+project_view = ProjectView.as_view('projects')
+skill_view = SkillView.as_view('skills')
+async_api.add_url_rule('/projects', view_func=project_view)
+async_api.add_url_rule('/projects/<int:project_id>', view_func=project_view)
+async_api.add_url_rule('/skill', view_func=skill_view)
+async_api.add_url_rule('/skill/<int:skill_id>', view_func=skill_view)
+async_api.add_url_rule('/comment', view_func=CommentView.as_view('comments'))
+
+
+def create_async_app(config=Config):
+    app = Quart(__name__)
+    app.config.from_object(config)
+    app.json = JSONProvider(app)
+
+    engine = create_async_engine(async_database_uri(app.config['SQLALCHEMY_DATABASE_URI']),
+                                 **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if engine.dialect.name == 'sqlite':
+        use_sqlite_pragmas(engine.sync_engine, app.config)
+    app.extensions['async_session'] = async_sessionmaker(engine, expire_on_commit=False)
+    app.extensions['events'] = make_broker(app.config)
+    app.register_blueprint(async_api)
+
+    @app.after_serving
+    async def dispose_engine():
+        await engine.dispose()
+
+    return app
@@ -0,0 +1,196 @@
+"""Compare the async read API with the Flask-RESTful Resources under the same load.
+
+Starts gunicorn (wsgi:app) and hypercorn (asgi:app) with the same number of
+worker processes against the same database, then drives each one with the
+same asyncio client: many concurrent keep-alive connections, optionally
+sending every request in two halves to emulate slow clients. Prints one
+JSON report with throughput and p50/p95/p99 latency per server.
+
+Usage:
+    python async_benchmark.py --database sqlite:////tmp/bench.db --connections 1000 --seconds 20 --slow-ms 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmark import percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SERVERS = {
+    'sync': lambda port, workers, threads: [
+        'gunicorn', '-c', 'gunicorn.conf.py', '-b', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--threads', str(threads), '--access-logfile', '/dev/null', 'wsgi:app'],
+    'async': lambda port, workers, threads: [
+        'hypercorn', '-b', f'127.0.0.1:{port}', '--workers', str(workers), 'asgi:app'],
+}
+
+PATHS = (
+    '/projects',
+    '/projects/{project}',
+    '/projects?user_id={user}',
+    '/skill',
+    '/skill/{skill}',
+    '/comment?project_id={project}',
+)
+
+
+def id_ranges(database):
+    # Borrow the Flask app once to find which ids exist
+    from app import create_app
+    from benchmark import id_ranges as ranges
+    from config import Config, engine_options
+
+    class RangeConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(database)
+
+    with create_app(RangeConfig).app_context():
+        return ranges()
+
+
+def request_paths(rng, ids):
+    while True:
+        yield rng.choice(PATHS).format(project=rng.randint(*ids['projects']), user=rng.randint(*ids['users']),
+                                       skill=rng.randint(*ids['skills']))
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("server closed the connection")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+async def client(port, paths, deadline, slow, latencies, errors):
+    reader = writer = None
+    for path in paths:
+        if time.monotonic() >= deadline:
+            break
+        raw = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: application/json\r\n\r\n".encode()
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            if slow:
+                writer.write(raw[:len(raw) // 2])
+                await writer.drain()
+                await asyncio.sleep(slow)
+                writer.write(raw[len(raw) // 2:])
+            else:
+                writer.write(raw)
+            await writer.drain()
+            status, closing = await read_response(reader)
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+            errors.append(path)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        if status >= 500:
+            errors.append(path)
+        if closing:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def drive(port, ids, args):
+    latencies, errors = [], []
+    deadline = time.monotonic() + args.seconds
+    clients = [client(port, request_paths(random.Random(args.seed + n), ids), deadline, args.slow_ms / 1000,
+                      latencies, errors)
+               for n in range(args.connections)]
+    started = time.perf_counter()
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+async def wait_until_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b"GET / HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            await read_response(reader)
+            writer.close()
+            return
+        except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+            await asyncio.sleep(0.2)
+    raise SystemExit(f"server on port {port} did not start")
+
+
+def run(name, port, ids, args):
+    env = dict(os.environ, DATABASE_URI=args.database, CACHE_BACKEND='memory' if args.cache else 'none',
+               SLOW_QUERY_MS='0', GUNICORN_MAX_REQUESTS='0')
+    server = subprocess.Popen(SERVERS[name](port, args.workers, args.threads), cwd=HERE, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_until_ready(port))
+        return asyncio.run(drive(port, ids, args))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default=os.environ.get('BENCH_DATABASE_URI', 'sqlite:////tmp/portfoliopro-bench.db'))
+    parser.add_argument('--connections', type=int, default=500, help='concurrent client connections')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--slow-ms', type=float, default=0, help='pause between the two halves of each request')
+    parser.add_argument('--workers', type=int, default=2, help='server processes for both servers')
+    parser.add_argument('--threads', type=int, default=4, help='threads per gunicorn worker')
+    parser.add_argument('--cache', action='store_true', help='keep the sync response cache on')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--server', action='append', choices=sorted(SERVERS), help='default: both')
+    parser.add_argument('--out', help='also write the report to this file')
+    args = parser.parse_args()
+
+    ids = id_ranges(args.database)
+    report = {"settings": {key: value for key, value in vars(args).items() if key not in ('out', 'server')}}
+    for port, name in enumerate(args.server or ('sync', 'async'), start=8101):
+        print(f"running {name} ...", file=sys.stderr, flush=True)
+        report[name] = run(name, port, ids, args)
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+"""Reproducible benchmark: synthetic data at scale plus a scenario suite.
+
+Builds (or reuses) a database filled by synthetic.generate(), then drives
+the API in-process through the Flask test client with list, filter, detail,
+write and mixed scenarios covering every Resource. Latency percentiles and
+throughput go to a JSON file; pass --baseline to diff against an earlier run.
+
+Usage:
+    python benchmark.py --database sqlite:////tmp/bench.db --fresh \
+        --users 100000 --projects 200000 --comments 1000000 --bookmarks 1000000
+    python benchmark.py --database sqlite:////tmp/bench.db --out after.json --baseline before.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from app import create_app
+from config import Config, engine_options
+from models import db, User, Project, Skill, Comment, Bookmark, ProjectSkill
+from synthetic import generate
+
+SEARCH_WORDS = ('data', 'web', 'system', 'model', 'app', 'design', 'network', 'project')
+
+
+# Each request factory gets (rng, ids) and returns (label, method, path, json body)
+
+def list_requests():
+    return [
+        lambda rng, ids: ('GET /user', 'GET', '/user', None),
+        lambda rng, ids: ('GET /projects', 'GET', '/projects', None),
+        lambda rng, ids: ('GET /skill', 'GET', '/skill', None),
+        lambda rng, ids: ('GET /bookmark', 'GET', '/bookmark', None),
+        lambda rng, ids: ('GET /comment', 'GET', '/comment', None),
+        lambda rng, ids: ('GET /projectskill', 'GET', '/projectskill', None),
+        lambda rng, ids: ('GET /projects?limit=200', 'GET', '/projects?limit=200', None),
+    ]
+
+
+def filter_requests():
+    return [
+        lambda rng, ids: ('GET /projects?user_id=', 'GET', f"/projects?user_id={pick(rng, ids, 'users')}", None),
+        lambda rng, ids: ('GET /projects?skill=', 'GET', f"/projects?skill={quote(rng.choice(ids['skill_names']))}", None),
+        lambda rng, ids: ('GET /projects?sort=-bookmark_count', 'GET', '/projects?sort=-bookmark_count', None),
+        lambda rng, ids: ('GET /comment?project_id=', 'GET', f"/comment?project_id={pick(rng, ids, 'projects')}", None),
+        lambda rng, ids: ('GET /comment?user_id=', 'GET', f"/comment?user_id={pick(rng, ids, 'users')}", None),
+        lambda rng, ids: ('GET /bookmark?user_id=', 'GET', f"/bookmark?user_id={pick(rng, ids, 'users')}", None),
+        lambda rng, ids: ('GET /projectskill?project_id=', 'GET', f"/projectskill?project_id={pick(rng, ids, 'projects')}", None),
+        lambda rng, ids: ('GET /projectskill?skill_id=', 'GET', f"/projectskill?skill_id={pick(rng, ids, 'skills')}", None),
+        lambda rng, ids: ('GET /search?q=', 'GET', f"/search?q={rng.choice(SEARCH_WORDS)}", None),
+    ]
+
+
+def detail_requests():
+    return [
+        lambda rng, ids: ('GET /user/<id>', 'GET', f"/user/{pick(rng, ids, 'users')}", None),
+        lambda rng, ids: ('GET /projects/<id>', 'GET', f"/projects/{pick(rng, ids, 'projects')}", None),
+        lambda rng, ids: ('GET /projects/<id>/full', 'GET', f"/projects/{pick(rng, ids, 'projects')}/full", None),
+        lambda rng, ids: ('GET /skill/<id>', 'GET', f"/skill/{pick(rng, ids, 'skills')}", None),
+    ]
+
+
+def write_requests():
+    def bookmark(rng, ids):
+        action = rng.choice(('bookmark', 'unbookmark'))
+        body = {"user_id": pick(rng, ids, 'users'), "project_id": pick(rng, ids, 'projects'), "action": action}
+        return 'POST /bookmark', 'POST', '/bookmark', body
+
+    def project_skill(rng, ids):
+        body = {"project_id": pick(rng, ids, 'projects'), "skill_id": pick(rng, ids, 'skills')}
+        return 'POST /projectskill', 'POST', '/projectskill', body
+
+    return [
+        lambda rng, ids: ('POST /comment', 'POST', '/comment', {
+            "user_id": pick(rng, ids, 'users'), "project_id": pick(rng, ids, 'projects'),
+            "content": f"benchmark comment {rng.random()}"}),
+        bookmark,
+        lambda rng, ids: ('PUT /projects/<id>', 'PUT', f"/projects/{pick(rng, ids, 'projects')}", {
+            "description": f"benchmark description {rng.random()}"}),
+        lambda rng, ids: ('PUT /skill/<id>', 'PUT', f"/skill/{pick(rng, ids, 'skills')}", {
+            "details": f"benchmark details {rng.random()}"}),
+        lambda rng, ids: ('PUT /user/<id>', 'PUT', f"/user/{pick(rng, ids, 'users')}", {"role": rng.choice(('user', 'admin'))}),
+        project_skill,
+    ]
+
+
+def mixed_requests():
+    # Roughly 80% reads, 20% writes
+    reads = list_requests() + filter_requests() * 2 + detail_requests() * 3
+    writes = write_requests()
+    return reads + writes * (len(reads) // (4 * len(writes)) or 1)
+
+
+SCENARIOS = {
+    'list': list_requests,
+    'filter': filter_requests,
+    'detail': detail_requests,
+    'write': write_requests,
+    'mixed': mixed_requests,
+}
+
+
+def pick(rng, ids, table):
+    low, high = ids[table]
+    return rng.randint(low, high)
+
+
+def id_ranges():
+    ranges = {}
+    for table, model in (('users', User), ('projects', Project), ('skills', Skill)):
+        low, high = db.session.query(func.min(model.id), func.max(model.id)).one()
+        if low is None:
+            raise SystemExit(f"No {table} in the benchmark database, run with --fresh")
+        ranges[table] = (low, high)
+    # ?skill= filters by name; there are few skills, so sample from all of them
+    ranges['skill_names'] = db.session.scalars(select(Skill.name).order_by(Skill.id)).all()
+    return ranges
+
+
+def table_sizes():
+    return {model.__tablename__: db.session.query(func.count(model.id)).scalar()
+            for model in (User, Project, Skill, ProjectSkill, Comment, Bookmark)}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def summarize(latencies, errors, elapsed=None):
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+    if elapsed is not None:
+        summary["throughput_rps"] = round(len(latencies) / elapsed, 1) if elapsed else 0.0
+    return summary
+
+
+def run_scenario(app, factories, ids, requests, clients, warmup, seed):
+    samples, lock = [], threading.Lock()
+    # Clients warm up first, the clock starts once all of them are through
+    ready = threading.Barrier(clients + 1)
+    per_client = max(1, requests // clients)
+
+    def worker(n):
+        rng = random.Random(seed * 1000 + n)
+        client = app.test_client()
+        local = []
+        for i in range(warmup + per_client):
+            if i == warmup:
+                ready.wait()
+            label, method, path, body = rng.choice(factories)(rng, ids)
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - started
+            response.close()
+            if i >= warmup:
+                local.append((label, elapsed, response.status_code >= 500))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = summarize([s[1] for s in samples], sum(s[2] for s in samples), elapsed)
+    endpoints = {}
+    for label, latency, error in samples:
+        endpoints.setdefault(label, ([], []))
+        endpoints[label][0].append(latency)
+        endpoints[label][1].append(error)
+    result["endpoints"] = {label: summarize(lat, sum(err)) for label, (lat, err) in sorted(endpoints.items())}
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n{'scenario':<10} {'p95 before':>11} {'p95 after':>10} {'change':>8} {'rps before':>11} {'rps after':>10}")
+    for name, result in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        print(f"{name:<10} {before['p95_ms']:>11} {result['p95_ms']:>10} {change:>+7.1f}% "
+              f"{before['throughput_rps']:>11} {result['throughput_rps']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', default=os.environ.get('BENCH_DATABASE_URI', 'sqlite:////tmp/portfoliopro-bench.db'))
+    parser.add_argument('--fresh', action='store_true', help='drop all tables and regenerate the data set')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--projects', type=int, default=20000)
+    parser.add_argument('--skills', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=100000)
+    parser.add_argument('--bookmarks', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run, repeatable (default: all)')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per client first')
+    parser.add_argument('--clients', type=int, default=1, help='concurrent in-process clients')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on (off by default)')
+    parser.add_argument('--out', default='benchmark.json')
+    parser.add_argument('--baseline', help='earlier --out file to compare against')
+    args = parser.parse_args()
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(args.database)
+        CACHE_BACKEND = 'memory' if args.cache else 'none'
+        SLOW_QUERY_MS = 0
+
+    app = create_app(BenchmarkConfig)
+    # 5xx responses are counted per endpoint in the report instead of logged
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        if args.fresh:
+            db.drop_all()
+        db.create_all()
+        if args.fresh:
+            started = time.perf_counter()
+            generated = generate(users=args.users, projects=args.projects, skills=args.skills,
+                                 comments=args.comments, bookmarks=args.bookmarks, seed=args.seed,
+                                 log=lambda message: print(f"generating {message}", flush=True))
+            print(f"generated {sum(generated.values())} rows in {time.perf_counter() - started:.1f}s")
+        ids = id_ranges()
+        sizes = table_sizes()
+
+    results = {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "database": make_url(args.database).get_backend_name(),
+        "tables": sizes,
+        "settings": {"requests": args.requests, "clients": args.clients, "warmup": args.warmup,
+                     "seed": args.seed, "cache": args.cache},
+        "scenarios": {},
+    }
+    for name in args.scenario or list(SCENARIOS):
+        result = run_scenario(app, SCENARIOS[name](), ids, args.requests, args.clients, args.warmup, args.seed)
+        results["scenarios"][name] = result
+        print(f"{name:<8} p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+              f"p99 {result['p99_ms']:>8} ms  {result['throughput_rps']:>8} req/s  errors {result['errors']}", flush=True)
+
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.out}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+from flask_restful import abort
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from models import db
+
+MAX_BATCH = 1000
+
+
+def dialect_insert(model):
+    # ON CONFLICT DO NOTHING lives on the dialect-specific insert construct
+    name = db.session.get_bind().dialect.name
+    if name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert(model)
+    if name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert(model)
+    abort(501, message=f"Bulk upserts are not supported on {name}")
+
+
+def is_unique_violation(error):
+    # SQLite reports "UNIQUE constraint failed", Postgres "violates unique constraint"
+    return 'unique' in str(error.orig).lower()
+
+
+def is_foreign_key_violation(error):
+    # SQLite reports "FOREIGN KEY constraint failed", Postgres "violates foreign key constraint"
+    return 'foreign key' in str(error.orig).lower()
+
+
+def is_id(value):
+    # JSON ids are plain integers; bool is an int subclass, so it is ruled out
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def valid_ids(ids):
+    return [row_id for row_id in ids if is_id(row_id)]
+
+
+def pick(item, fields):
+    return {field: item[field] for field in fields if field in item}
+
+
+def validate_items(items, required, allowed):
+    # Splits a request array into insertable rows and per-item error results
+    rows, results = [], [None] * len(items)
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {"index": index, "status": "invalid", "message": "Item must be an object"}
+            continue
+        missing = [field for field in required if not item.get(field)]
+        if missing:
+            results[index] = {"index": index, "status": "invalid", "message": f"Missing {', '.join(missing)}"}
+            continue
+        rows.append((index, pick(item, allowed)))
+    return rows, results
+
+
+def row_key_of(row, key):
+    # Compared as strings so "3" from JSON matches the 3 that RETURNING gives back
+    return tuple(str(row[field]) for field in key)
+
+
+def bulk_insert(model, items, required, allowed, key):
+    # Inserts every valid item in one executemany, skipping rows that hit a unique key
+    rows, results = validate_items(items, required, allowed)
+
+    seen, params = set(), []
+    for index, row in rows:
+        row_key = row_key_of(row, key)
+        if row_key in seen:
+            results[index] = {"index": index, "status": "conflict"}
+            continue
+        seen.add(row_key)
+        params.append((index, row))
+
+    inserted, invalid = {}, {}
+    if params:
+        columns = [getattr(model, field) for field in key]
+        stmt = dialect_insert(model).on_conflict_do_nothing().returning(model.id, *columns)
+
+        def insert(rows):
+            for row in db.session.execute(stmt, rows):
+                inserted[tuple(str(value) for value in row[1:])] = row[0]
+
+        try:
+            with db.session.begin_nested():
+                insert([row for _, row in params])
+        except IntegrityError:
+            # Unique keys are skipped by ON CONFLICT, so some row points at a
+            # missing parent or breaks another constraint; redo them one at a
+            # time to find which, as bulk_update does
+            inserted.clear()
+            for index, row in params:
+                try:
+                    with db.session.begin_nested():
+                        insert([row])
+                except IntegrityError as error:
+                    invalid[index] = "Refers to a missing row" if is_foreign_key_violation(error) else "Breaks a constraint"
+
+    for index, row in params:
+        row_id = inserted.get(row_key_of(row, key))
+        if index in invalid:
+            results[index] = {"index": index, "status": "invalid", "message": invalid[index]}
+        elif row_id is None:
+            results[index] = {"index": index, "status": "conflict"}
+        else:
+            results[index] = {"index": index, "status": "created", "id": row_id}
+    return results
+
+
+def bulk_update(model, items, allowed):
+    # One executemany UPDATE keyed on id; a single SELECT finds the missing ids
+    results = [None] * len(items)
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not is_id(item.get('id')):
+            results[index] = {"index": index, "status": "invalid", "message": "Missing or invalid id"}
+            continue
+        rows.append((index, dict(pick(item, allowed), id=item['id'])))
+
+    ids = [row['id'] for _, row in rows]
+    existing = set(db.session.scalars(select(model.id).where(model.id.in_(ids)))) if ids else set()
+
+    params = []
+    for index, row in rows:
+        if row['id'] in existing:
+            params.append((index, row))
+            results[index] = {"index": index, "status": "updated", "id": row['id']}
+        else:
+            results[index] = {"index": index, "status": "not_found", "id": row['id']}
+
+    if params:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(update(model), [row for _, row in params])
+        except IntegrityError:
+            # Some row broke a constraint; redo them one at a time to find
+            # which, so only those fail instead of the whole batch
+            for index, row in params:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(update(model), [row])
+                except IntegrityError as error:
+                    status = "conflict" if is_unique_violation(error) else "invalid"
+                    results[index] = {"index": index, "status": status, "id": row['id']}
+    return results
+
+
+def delete_children(column, ids):
+    # Deletes the rows whose foreign key column points at one of ids, before
+    # the parents go, and returns their ids for the change log
+    model = column.class_
+    ids = valid_ids(ids)
+    if not ids:
+        return []
+    return db.session.scalars(delete(model).where(column.in_(ids)).returning(model.id)).all()
+
+
+def bulk_delete(model, ids):
+    valid = valid_ids(ids)
+    deleted = set(db.session.scalars(delete(model).where(model.id.in_(valid)).returning(model.id))) if valid else set()
+    results = []
+    for index, row_id in enumerate(ids):
+        if not is_id(row_id):
+            results.append({"index": index, "status": "invalid", "message": "Invalid id"})
+        else:
+            results.append({"index": index, "status": "deleted" if row_id in deleted else "not_found", "id": row_id})
+    return results
+
+
+def read_batch(data):
+    # Request bodies are a JSON array of at most MAX_BATCH items
+    if not isinstance(data, list) or not data:
+        return None, ({"message": "Request body must be a non-empty array"}, 400)
+    if len(data) > MAX_BATCH:
+        return None, ({"message": f"At most {MAX_BATCH} items per request"}, 400)
+    return data, None
@@ -0,0 +1,243 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, g, request
+from compression import negotiate
+from representations import dumps
+
+
+class MemoryBackend:
+    # In-process LRU with a per-entry TTL; an entry leaves its tags when it is
+    # evicted or expires, so the tags never hold more than maxsize keys
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.tags = {}
+        self.key_tags = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                self.untag(key)
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                evicted, _ = self.entries.popitem(last=False)
+                self.untag(evicted)
+
+    # Encoded bodies are stored as-is alongside the JSON entries
+    get_raw = get
+    set_raw = set
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+                self.untag(key)
+
+    def tag(self, tag, key, ttl):
+        with self.lock:
+            if key not in self.entries:
+                return
+            self.tags.setdefault(tag, set()).add(key)
+            self.key_tags.setdefault(key, set()).add(tag)
+
+    def pop_tag(self, tag):
+        with self.lock:
+            keys = self.tags.pop(tag, set())
+            for key in keys:
+                tags = self.key_tags.get(key)
+                if tags is not None:
+                    tags.discard(tag)
+                    if not tags:
+                        del self.key_tags[key]
+            return keys
+
+    def untag(self, key):
+        # Called with the lock held
+        for tag in self.key_tags.pop(key, ()):
+            keys = self.tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+
+
+class RedisBackend:
+    # Works with any Redis-compatible client (redis-py, fakeredis, ...)
+
+    def __init__(self, client, prefix='portfoliopro:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, ttl, dumps(value))
+
+    def get_raw(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set_raw(self, key, value, ttl):
+        self.client.setex(self.prefix + key, ttl, value)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def tag(self, tag, key, ttl):
+        # Sorted set scored by expiry: members whose entry has expired are
+        # trimmed on every add, and the set itself expires with its newest entry.
+        # Named tagset: because tag: keys written by older versions are plain sets
+        name = self.prefix + 'tagset:' + tag
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zadd(name, {key: now + ttl})
+        pipe.zremrangebyscore(name, '-inf', now)
+        pipe.expire(name, ttl)
+        pipe.execute()
+
+    def pop_tag(self, tag):
+        name = self.prefix + 'tagset:' + tag
+        pipe = self.client.pipeline()
+        pipe.zrange(name, 0, -1)
+        pipe.delete(name)
+        members, _ = pipe.execute()
+        return {m.decode() if isinstance(m, bytes) else m for m in members}
+
+
+class CacheState:
+    # Backend and counters for one app, so each create_app() call is isolated
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = {}
+        self.misses = {}
+        self.lock = threading.Lock()
+
+    def count(self, counters, resource):
+        with self.lock:
+            counters[resource] = counters.get(resource, 0) + 1
+
+
+class ResponseCache:
+    # Read-through cache for Resource GETs, invalidated by the write handlers
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_TTL', 300)
+        app.config.setdefault('CACHE_MAXSIZE', 1024)
+        app.config.setdefault('CACHE_REDIS_URL', None)
+
+        backend = app.config['CACHE_BACKEND']
+        if backend == 'redis':
+            import redis
+            backend = RedisBackend(redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+        elif backend == 'memory':
+            backend = MemoryBackend(int(app.config['CACHE_MAXSIZE']))
+        elif backend == 'none':
+            backend = None
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {backend!r}")
+        app.extensions['response_cache'] = CacheState(backend, int(app.config['CACHE_TTL']))
+
+    @property
+    def state(self):
+        return current_app.extensions['response_cache']
+
+    def key(self, resource, resource_id=None):
+        query = urlencode(sorted(request.args.items(multi=True)))
+        scope = 'list' if resource_id is None else str(resource_id)
+        return f"{resource}:{scope}?{query}"
+
+    def encoded_key(self, key, encoding):
+        return f"{key}|{encoding}"
+
+    def offer_encoded(self, state, key, tag):
+        # Compression hands back the compressed body so later hits skip recompressing
+        def store(encoding, body):
+            encoded_key = self.encoded_key(key, encoding)
+            state.backend.set_raw(encoded_key, body, state.ttl)
+            state.backend.tag(tag, encoded_key, state.ttl)
+        g.cache_encoded = store
+
+    def cached(self, resource, id_arg):
+        # Decorator for Resource.get; only plain (body, 200) results are stored
+        def decorator(get):
+            @wraps(get)
+            def wrapper(*args, **kwargs):
+                state = self.state
+                if state.backend is None:
+                    return get(*args, **kwargs)
+
+                resource_id = kwargs.get(id_arg)
+                key = self.key(resource, resource_id)
+                tag = f"{resource}:{'list' if resource_id is None else resource_id}"
+                encoding = negotiate()
+                hit = state.backend.get(key)
+                if hit is not None:
+                    state.count(state.hits, resource)
+                    body = state.backend.get_raw(self.encoded_key(key, encoding)) if encoding else None
+                    if body is not None:
+                        return current_app.response_class(body, status=hit[1], mimetype='application/json', headers={
+                            'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'})
+                    self.offer_encoded(state, key, tag)
+                    return hit[0], hit[1]
+
+                state.count(state.misses, resource)
+                result = get(*args, **kwargs)
+                if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                    # Encoded copies of an older entry must not outlive it
+                    state.backend.delete(*(self.encoded_key(key, name) for name in ('br', 'gzip')))
+                    state.backend.set(key, [result[0], result[1]], state.ttl)
+                    state.backend.tag(tag, key, state.ttl)
+                    self.offer_encoded(state, key, tag)
+                return result
+            return wrapper
+        return decorator
+
+    def invalidate(self, resource, *resource_ids):
+        # Drop the listing pages of a resource plus the given detail entries
+        backend = self.state.backend
+        if backend is None:
+            return
+        keys = set(backend.pop_tag(f"{resource}:list"))
+        for resource_id in resource_ids:
+            if resource_id is not None:
+                keys |= backend.pop_tag(f"{resource}:{resource_id}")
+        backend.delete(*keys)
+
+    def stats(self):
+        state = self.state
+        with state.lock:
+            resources = sorted(set(state.hits) | set(state.misses))
+            return {
+                resource: {"hits": state.hits.get(resource, 0), "misses": state.misses.get(resource, 0)}
+                for resource in resources
+            }
+
+
+cache = ResponseCache()
@@ -0,0 +1,160 @@
+import threading
+import time
+from flask import current_app, has_app_context
+from flask_restful import abort
+from sqlalchemy import event, func, insert, text
+from sqlalchemy.orm import Session
+from models import db, Change
+
+# Change feed for incremental sync. Write handlers call changes.record()
+# before they commit; the rows go into the changes table from before_commit,
+# so they land in the same transaction as the write or not at all. Readers
+# follow GET /changes?since=<seq>, optionally long-polling with ?wait=.
+
+ACTIONS = ('created', 'updated', 'deleted')
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+# Postgres can commit seqs out of order; writers of the log take this lock so
+# a reader never skips past a seq that has yet to commit
+ADVISORY_LOCK = 728301
+
+
+@event.listens_for(Session, 'before_commit')
+def write_changes(session):
+    pending = session.info.pop('changes', None)
+    if not pending:
+        return
+    session.flush()  # ids of new rows
+    if session.get_bind().dialect.name == 'postgresql':
+        session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': ADVISORY_LOCK})
+    session.execute(insert(Change), [
+        {'resource': resource, 'resource_id': getattr(target, 'id', target), 'action': action}
+        for resource, action, target in pending
+    ])
+    session.info['changes_written'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def wake_readers(session):
+    if session.info.pop('changes_written', False) and has_app_context():
+        state = current_app.extensions.get('changes')
+        if state is not None:
+            state.notify()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def drop_changes(session, previous_transaction):
+    session.info.pop('changes', None)
+    session.info.pop('changes_written', None)
+
+
+class ChangeState:
+    # Wakes long-polling readers in this process; writes from other processes
+    # are picked up by re-reading every CHANGES_POLL_INTERVAL seconds
+
+    def __init__(self, max_wait, poll_interval):
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+
+
+class ChangeLog:
+    # Records writes into the current transaction and serves GET /changes
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CHANGES_MAX_WAIT', 30)
+        app.config.setdefault('CHANGES_POLL_INTERVAL', 1.0)
+        app.extensions['changes'] = ChangeState(float(app.config['CHANGES_MAX_WAIT']),
+                                                float(app.config['CHANGES_POLL_INTERVAL']))
+
+    @property
+    def state(self):
+        return current_app.extensions['changes']
+
+    def record(self, resource, action, *targets):
+        # targets are ids or model instances, whose ids are read at commit
+        pending = db.session.info.setdefault('changes', [])
+        pending.extend((resource, action, target) for target in targets if target is not None)
+
+    def record_results(self, resource, results):
+        # Per-item results from bulk.py; only rows that actually changed are logged
+        for result in results:
+            if result["status"] in ACTIONS:
+                self.record(resource, result["status"], result["id"])
+
+    def head(self):
+        return db.session.query(func.max(Change.seq)).scalar() or 0
+
+    def read(self, since, limit, wait):
+        # Rows after since, waiting up to `wait` seconds for the first one
+        state = self.state
+        deadline = time.monotonic() + min(wait, state.max_wait)
+        while True:
+            generation = state.generation
+            rows = (db.session.query(Change.seq, Change.resource, Change.resource_id, Change.action, Change.changed_at)
+                    .filter(Change.seq > since).order_by(Change.seq).limit(limit + 1).all())
+            remaining = deadline - time.monotonic()
+            if rows or remaining <= 0:
+                return rows
+            # End the read transaction so the next read sees new commits,
+            # and hand the connection back to the pool while idle
+            db.session.close()
+            state.wait(generation, min(state.poll_interval, remaining))
+
+    def page(self, args):
+        limit = min(get_int(args, 'limit', DEFAULT_LIMIT, 1), MAX_LIMIT)
+        if args.get('since') is None:
+            # Where to start following from, after a full download
+            return {"items": [], "limit": limit, "since": self.head(), "has_more": False}
+
+        since = get_int(args, 'since', 0, 0)
+        rows = self.read(since, limit, get_float(args, 'wait', 0))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [
+                {"seq": row.seq, "resource": row.resource, "id": row.resource_id,
+                 "action": row.action, "changed_at": row.changed_at}
+                for row in rows
+            ],
+            "limit": limit,
+            "since": rows[-1].seq if rows else since,
+            "has_more": has_more,
+        }
+
+
+def get_int(args, name, default, minimum):
+    try:
+        value = int(args.get(name, default))
+    except (TypeError, ValueError):
+        abort(400, message=f"'{name}' must be an integer")
+    if value < minimum:
+        abort(400, message=f"'{name}' must be at least {minimum}")
+    return value
+
+
+def get_float(args, name, default):
+    try:
+        value = float(args.get(name, default))
+    except (TypeError, ValueError):
+        abort(400, message=f"'{name}' must be a number")
+    if not value >= 0:
+        abort(400, message=f"'{name}' must be at least 0")
+    return value
+
+
+changes = ChangeLog()
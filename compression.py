@@ -0,0 +1,90 @@
+import zlib
+from flask import current_app, g, request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE = ('application/json', 'application/x-ndjson', 'text/plain')
+
+
+def negotiate():
+    # Best encoding the client accepts, br preferred on ties; None means identity
+    offered = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return request.accept_encodings.best_match(offered)
+
+
+def encoder(encoding):
+    # (compress, flush, finish) for one response; flush emits everything
+    # compressed so far so streamed chunks reach the client without waiting
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=current_app.config['COMPRESS_BROTLI_QUALITY'])
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(current_app.config['COMPRESS_GZIP_LEVEL'], zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress(body, encoding):
+    compress_chunk, _, finish = encoder(encoding)
+    return compress_chunk(body) + finish()
+
+
+def compress_stream(chunks, encoding):
+    # The encoder is built here, while the app context is still active
+    compress_chunk, flush, finish = encoder(encoding)
+    return _compressed(chunks, compress_chunk, flush, finish)
+
+
+def _compressed(chunks, compress_chunk, flush, finish):
+    try:
+        for chunk in chunks:
+            data = compress_chunk(chunk.encode() if isinstance(chunk, str) else chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        # Close the wrapped stream (and its request context) on disconnect too
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+class Compression:
+    # gzip/brotli for JSON, NDJSON and metrics responses above COMPRESS_MIN_SIZE
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BROTLI_QUALITY', 5)
+        app.after_request(self.compress_response)
+
+    def compress_response(self, response):
+        if (request.method == 'HEAD' or response.status_code != 200 or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE or response.direct_passthrough):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding)
+        else:
+            body = response.get_data()
+            if len(body) < current_app.config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(compress(body, encoding))
+            # Let the response cache keep these bytes for its next hit
+            store = g.pop('cache_encoded', None)
+            if store is not None:
+                store(encoding, response.get_data())
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+compression = Compression()
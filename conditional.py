@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+from functools import wraps
+from zlib import crc32
+from flask import Response, request
+from werkzeug.http import http_date
+from sqlalchemy import func, select
+from models import db, Change
+
+
+def timestamp_column(model):
+    # Bookmarks are never edited, so their created_at doubles as the version
+    return getattr(model, 'updated_at', None) or getattr(model, 'created_at', None)
+
+
+def change_heads(resources):
+    # Newest change-log seq of each resource, one index seek apiece
+    return [select(Change.seq).where(Change.resource == resource).order_by(Change.seq.desc()).limit(1).scalar_subquery()
+            for resource in resources]
+
+
+def validators(model, resource_id=None, item_tables=(), list_tables=()):
+    # Cheap validators, never from the body; *_tables name the other tables a
+    # response draws from, so a write to any of them changes the ETag too
+    if resource_id is not None:
+        # The row's own timestamp, plus the newest change to its table and to
+        # what it embeds; the timestamp only has whole seconds on SQLite, the
+        # table's head tells two writes in the same second apart
+        stamp = timestamp_column(model)
+        heads = change_heads((model.__tablename__, *item_tables))
+        row = db.session.query(stamp if stamp is not None else model.id, *heads).filter(
+            model.id == resource_id).first()
+        if row is None:
+            return None, None
+        version, heads = row[0], row[1:]
+        scope = str(resource_id)
+    else:
+        # Every API write to the table or the tables it joins moves a head,
+        # max(id) catches rows inserted around the API (flask seed)
+        version = None
+        heads = db.session.query(func.max(model.id), *change_heads((model.__tablename__, *list_tables))).one()
+        scope = f"list-{crc32(request.full_path.encode()):x}"
+
+    parts = [model.__tablename__, scope]
+    last_modified = None
+    if isinstance(version, datetime):
+        last_modified = version.replace(tzinfo=timezone.utc, microsecond=0)
+        parts.append(last_modified.strftime('%Y%m%d%H%M%S'))
+    elif version is not None:
+        parts.append(str(version))
+    parts.extend(str(head or 0) for head in heads)
+    return '-'.join(parts), last_modified
+
+
+def not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(model, id_arg=None, item_tables=(), list_tables=()):
+    # Decorator for Resource.get: answers 304 before the handler serializes anything
+    def decorator(get):
+        @wraps(get)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = validators(model, kwargs.get(id_arg), item_tables, list_tables)
+            if etag is None:
+                return get(*args, **kwargs)
+
+            headers = {'ETag': f'W/"{etag}"'}
+            if last_modified is not None:
+                headers['Last-Modified'] = http_date(last_modified)
+
+            if not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+
+            result = get(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code == 200:
+                    result.headers.update(headers)
+                return result
+            if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                return result[0], result[1], headers
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,94 @@
+import os
+from sqlalchemy import event
+
+
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def engine_options(database_uri):
+    # Pool sizing for server databases; SQLite is tuned with pragmas instead
+    if not database_uri or database_uri.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+    }
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URI')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    # Statements slower than this are logged with the app.py line that ran them; 0 disables
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+    # 'orjson' or 'json'; unset uses orjson when it is installed
+    JSON_BACKEND = os.environ.get('JSON_BACKEND')
+
+    # Bodies smaller than this go out uncompressed; br needs the brotli package
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+
+    # Per-process; other workers' writes show up after FEED_CACHE_TTL at worst
+    FEED_CACHE = env_bool('FEED_CACHE', False)
+    FEED_CACHE_DEPTH = int(os.environ.get('FEED_CACHE_DEPTH', 1000))
+    FEED_CACHE_USERS = int(os.environ.get('FEED_CACHE_USERS', 256))
+    FEED_CACHE_TTL = int(os.environ.get('FEED_CACHE_TTL', 300))
+
+    # Longest a GET /changes?wait= request is held open
+    CHANGES_MAX_WAIT = float(os.environ.get('CHANGES_MAX_WAIT', 30))
+    CHANGES_POLL_INTERVAL = float(os.environ.get('CHANGES_POLL_INTERVAL', 1.0))
+
+    # 'memory' reaches streams in the same process only; 'redis' fans out to every worker
+    EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'memory')
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL')
+    EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', 15))
+    EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 100))
+
+    # Per-process buffer of bookmark toggles; other workers' reads and project
+    # bookmark counts catch up within BOOKMARK_FLUSH_INTERVAL seconds
+    BOOKMARK_WRITE_BEHIND = env_bool('BOOKMARK_WRITE_BEHIND', False)
+    BOOKMARK_FLUSH_INTERVAL = float(os.environ.get('BOOKMARK_FLUSH_INTERVAL', 0.5))
+    BOOKMARK_FLUSH_SIZE = int(os.environ.get('BOOKMARK_FLUSH_SIZE', 500))
+    BOOKMARK_SPOOL = os.environ.get('BOOKMARK_SPOOL')
+
+
+def apply_sqlite_pragmas(dbapi_connection, busy_timeout):
+    # WAL lets readers run alongside the single writer, busy_timeout makes
+    # writers wait for the lock instead of failing with "database is locked".
+    # The driver's own transaction handling is off, see use_sqlite_pragmas
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout)}')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
+def use_sqlite_pragmas(engine, config):
+    # Listens on one engine, so the timeout comes from the config of the app
+    # that owns it rather than the Config class
+    busy_timeout = config.get('SQLITE_BUSY_TIMEOUT', Config.SQLITE_BUSY_TIMEOUT)
+    event.listen(engine, 'connect', lambda dbapi_connection, record: apply_sqlite_pragmas(dbapi_connection, busy_timeout))
+    # pysqlite only sends BEGIN before DML, so a SAVEPOINT opened first ran
+    # outside any transaction and its RELEASE committed for good; every
+    # session transaction now starts with a real BEGIN
+    event.listen(engine, 'begin', begin_sqlite_transaction)
+
+
+def begin_sqlite_transaction(connection):
+    # Straight on the driver connection, where other drivers begin implicitly,
+    # so BEGIN is not counted as a statement by metrics and the query-count tests
+    cursor = connection.connection.cursor()
+    cursor.execute('BEGIN')
+    cursor.close()
@@ -0,0 +1,32 @@
+from sqlalchemy import func, or_, select, update
+from changes import changes
+from models import db, Project, Bookmark, Comment
+
+
+def bump(column, project_id, delta):
+    # Atomic UPDATE projects SET n = n + delta, no read-modify-write; returns
+    # the new value, or None when the project does not exist
+    return db.session.execute(
+        update(Project).where(Project.id == project_id).values({column: column + delta}).returning(column)
+    ).scalar()
+
+
+def actual_counts():
+    bookmarks = select(func.count(Bookmark.id)).where(Bookmark.project_id == Project.id).scalar_subquery()
+    comments = select(func.count(Comment.id)).where(Comment.project_id == Project.id).scalar_subquery()
+    return bookmarks, comments
+
+
+def reconcile():
+    # Recount every project's counters and repair the ones that drifted; the
+    # repairs go into the change log like any other project update
+    bookmarks, comments = actual_counts()
+    repaired = db.session.scalars(
+        update(Project).where(or_(Project.bookmark_count != bookmarks, Project.comment_count != comments))
+        .values({Project.bookmark_count: bookmarks, Project.comment_count: comments})
+        .returning(Project.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    changes.record('projects', 'updated', *repaired)
+    db.session.commit()
+    return len(repaired)
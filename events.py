@@ -0,0 +1,224 @@
+import asyncio
+import functools
+import logging
+import queue
+import threading
+from flask import Response, current_app
+from sqlalchemy import inspect
+from models import Comment
+from representations import dumps
+from timeline import since_token, timeline_query
+
+# Live project events over Server-Sent Events. Write handlers publish to a
+# broker after they commit; every open stream on that project gets the frame,
+# encoded once at publish time. The memory broker only reaches streams in the
+# same process; with EVENTS_BACKEND=redis frames go through Redis pub/sub so
+# any worker, including the async app, can serve the streams.
+
+logger = logging.getLogger('portfoliopro.events')
+
+
+def best_effort(method):
+    # Events go out after the write has committed, so a broker that is down is
+    # logged instead of turning a stored comment or bookmark into a 500
+    @functools.wraps(method)
+    def wrapper(self, project_id, *args):
+        try:
+            method(self, project_id, *args)
+        except Exception:
+            logger.exception("Failed to publish %s for project %s", method.__name__, project_id)
+    return wrapper
+
+
+def channel_name(project_id):
+    return f"project:{project_id}"
+
+
+def frame(event, data, event_id=None):
+    lines = [f"event: {event}".encode()]
+    if event_id is not None:
+        lines.append(f"id: {event_id}".encode())
+    lines.append(b"data: " + dumps(data))
+    return b"\n".join(lines) + b"\n\n"
+
+
+HEARTBEAT = b": keep-alive\n\n"
+
+
+class MemoryBroker:
+    # Subscribers are callables taking a frame; they must not block
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, channel, deliver):
+        with self.lock:
+            self.subscribers.setdefault(channel, set()).add(deliver)
+
+    def unsubscribe(self, channel, deliver):
+        with self.lock:
+            subscribers = self.subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(deliver)
+                if not subscribers:
+                    del self.subscribers[channel]
+
+    def listening(self, channel):
+        return channel in self.subscribers
+
+    def dispatch(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for deliver in subscribers:
+            deliver(message)
+
+    def publish(self, channel, message):
+        self.dispatch(channel, message)
+
+
+class RedisBroker(MemoryBroker):
+    # Publishes through Redis and relays everything back to local streams from
+    # one listener thread, started by the first subscriber of this process
+
+    def __init__(self, client, prefix='portfoliopro:events:'):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self.listener = None
+
+    def subscribe(self, channel, deliver):
+        super().subscribe(channel, deliver)
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name='events-redis', daemon=True)
+                self.listener.start()
+
+    def listening(self, channel):
+        # Streams may be open in any process
+        return True
+
+    def publish(self, channel, message):
+        self.client.publish(self.prefix + channel, message)
+
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + '*')
+        for item in pubsub.listen():
+            channel = item['channel']
+            channel = channel.decode() if isinstance(channel, bytes) else channel
+            try:
+                self.dispatch(channel[len(self.prefix):], item['data'])
+            except Exception:
+                logger.exception("Failed to deliver event on %s", channel)
+
+
+def make_broker(config):
+    backend = config.get('EVENTS_BACKEND', 'memory')
+    if backend == 'redis':
+        import redis
+        return RedisBroker(redis.Redis.from_url(config.get('EVENTS_REDIS_URL') or config.get('CACHE_REDIS_URL')))
+    if backend == 'memory':
+        return MemoryBroker()
+    raise ValueError(f"Unknown EVENTS_BACKEND {backend!r}")
+
+
+def frames(broker, channel, heartbeat, queue_size):
+    # Blocking stream for WSGI workers. A client that falls queue_size frames
+    # behind is disconnected; it reconnects and catches up from the timeline.
+    messages = queue.Queue(queue_size)
+    overflowed = threading.Event()
+
+    def deliver(message):
+        try:
+            messages.put_nowait(message)
+        except queue.Full:
+            overflowed.set()
+
+    broker.subscribe(channel, deliver)
+    try:
+        yield HEARTBEAT
+        while not overflowed.is_set():
+            try:
+                yield messages.get(timeout=heartbeat)
+            except queue.Empty:
+                yield HEARTBEAT
+    finally:
+        broker.unsubscribe(channel, deliver)
+
+
+async def async_frames(broker, channel, heartbeat, queue_size):
+    # Same stream as a coroutine, so an idle connection costs no thread
+    loop = asyncio.get_running_loop()
+    messages = asyncio.Queue(queue_size)
+    overflowed = asyncio.Event()
+
+    def put(message):
+        try:
+            messages.put_nowait(message)
+        except asyncio.QueueFull:
+            overflowed.set()
+
+    def deliver(message):
+        loop.call_soon_threadsafe(put, message)
+
+    broker.subscribe(channel, deliver)
+    try:
+        yield HEARTBEAT
+        while not overflowed.is_set():
+            try:
+                yield await asyncio.wait_for(messages.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+    finally:
+        broker.unsubscribe(channel, deliver)
+
+
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+class Events:
+    # Broker for this app plus the publish helpers the write handlers call
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EVENTS_BACKEND', 'memory')
+        app.config.setdefault('EVENTS_REDIS_URL', None)
+        app.config.setdefault('EVENTS_HEARTBEAT', 15)
+        app.config.setdefault('EVENTS_QUEUE_SIZE', 100)
+        app.extensions['events'] = make_broker(app.config)
+
+    @property
+    def broker(self):
+        return current_app.extensions['events']
+
+    def publish(self, project_id, event, data, event_id=None):
+        self.broker.publish(channel_name(project_id), frame(event, data, event_id))
+
+    @best_effort
+    def comment_added(self, project_id, comment):
+        # Same item the timeline returns; its since token is the event id
+        if not self.broker.listening(channel_name(project_id)):
+            return
+        query, serialize = timeline_query(project_id)
+        # identity reads the committed id without reloading the expired instance
+        row = query.filter(Comment.id == inspect(comment).identity[0]).first()
+        if row is not None:
+            self.publish(project_id, 'comment', serialize(row), since_token(row))
+
+    @best_effort
+    def bookmarks_changed(self, project_id, bookmark_count):
+        if bookmark_count is not None and self.broker.listening(channel_name(project_id)):
+            self.publish(project_id, 'bookmarks', {"project_id": int(project_id), "bookmark_count": bookmark_count})
+
+    def stream(self, project_id):
+        config = current_app.config
+        chunks = frames(self.broker, channel_name(project_id), float(config['EVENTS_HEARTBEAT']),
+                        int(config['EVENTS_QUEUE_SIZE']))
+        return Response(chunks, mimetype='text/event-stream', headers=STREAM_HEADERS)
+
+
+events = Events()
@@ -0,0 +1,209 @@
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app, request
+from flask_restful import abort
+from models import Bookmark
+from pagination import build_page, decode_cursor, get_limit, paginate
+from schemas import bookmark_schema
+
+# "My saved projects": a user's bookmarks newest first, read straight off
+# ix_bookmarks_user_id_created_at with the project joined in. The keyset is
+# (created_at DESC, project_id), which is unique per user because of
+# unique_user_bookmark, so the index order is the page order.
+
+FEED_FIELDS = ("id", "project_id", "project_title", "project_image", "created_at")
+FEED_ORDER = [(Bookmark.created_at, True), (Bookmark.project_id, False)]
+EPOCH = datetime(1970, 1, 1)
+
+
+def feed_query(user_id):
+    query, serialize = bookmark_schema.listing(*FEED_FIELDS)
+    return query.filter(Bookmark.user_id == user_id), serialize
+
+
+def feed_key(created_at, project_id):
+    # Ascending in feed order, for bisecting a cached feed
+    return EPOCH - created_at, project_id
+
+
+def as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Feed:
+    # The newest rows of one user's feed; complete when it holds all of them
+
+    def __init__(self, rows, complete, expires_at):
+        self.rows = rows
+        self.keys = [feed_key(row.created_at, row.project_id) for row in rows]
+        self.complete = complete
+        self.expires_at = expires_at
+
+
+class FeedState:
+    # Per-app LRU of feeds, patched in place by the bookmark write handlers
+
+    def __init__(self, depth, maxsize, ttl):
+        self.depth = depth
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.feeds = OrderedDict()
+        self.writes = 0
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            feed = self.feeds.get(user_id)
+            if feed is None:
+                return None
+            if feed.expires_at < time.monotonic():
+                del self.feeds[user_id]
+                return None
+            self.feeds.move_to_end(user_id)
+            return feed
+
+    def load(self, user_id):
+        # A write that lands while the head is being read makes it stale, so it is not kept
+        writes = self.writes
+        query, _ = feed_query(user_id)
+        rows = query.order_by(Bookmark.created_at.desc(), Bookmark.project_id).limit(self.depth + 1).all()
+        feed = Feed(rows[:self.depth], len(rows) <= self.depth, time.monotonic() + self.ttl)
+        with self.lock:
+            if writes == self.writes:
+                self.feeds[user_id] = feed
+                while len(self.feeds) > self.maxsize:
+                    self.feeds.popitem(last=False)
+        return feed
+
+    def written(self):
+        with self.lock:
+            self.writes += 1
+
+    def insert(self, user_id, row):
+        with self.lock:
+            self.writes += 1
+            feed = self.feeds.get(user_id)
+            if feed is None:
+                return
+            key = feed_key(row.created_at, row.project_id)
+            position = bisect_right(feed.keys, key)
+            if position == len(feed.rows) and not feed.complete:
+                return
+            feed.keys.insert(position, key)
+            feed.rows.insert(position, row)
+            if len(feed.rows) > self.depth:
+                del feed.keys[self.depth:], feed.rows[self.depth:]
+                feed.complete = False
+
+    def remove(self, user_id, project_id):
+        with self.lock:
+            self.writes += 1
+            feed = self.feeds.get(user_id)
+            if feed is None:
+                return
+            for position, row in enumerate(feed.rows):
+                if row.project_id == project_id:
+                    del feed.keys[position], feed.rows[position]
+                    break
+
+    def drop(self, predicate):
+        with self.lock:
+            self.writes += 1
+            for user_id in [user_id for user_id, feed in self.feeds.items() if predicate(user_id, feed)]:
+                del self.feeds[user_id]
+
+
+class BookmarkFeeds:
+    # Serves the feed pages; FEED_CACHE keeps the newest FEED_CACHE_DEPTH rows
+    # of recently read feeds in memory and patches them on bookmark/unbookmark
+    # instead of rebuilding them
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FEED_CACHE', False)
+        app.config.setdefault('FEED_CACHE_DEPTH', 1000)
+        app.config.setdefault('FEED_CACHE_USERS', 256)
+        app.config.setdefault('FEED_CACHE_TTL', 300)
+
+        state = None
+        if app.config['FEED_CACHE']:
+            state = FeedState(int(app.config['FEED_CACHE_DEPTH']), int(app.config['FEED_CACHE_USERS']),
+                              int(app.config['FEED_CACHE_TTL']))
+        app.extensions['bookmark_feeds'] = state
+
+    @property
+    def state(self):
+        return current_app.extensions['bookmark_feeds']
+
+    def page(self, user_id):
+        query, serialize = feed_query(user_id)
+        if self.state is not None:
+            page = self.cached_page(self.state, user_id, serialize)
+            if page is not None:
+                return page
+        return paginate(query, Bookmark, serialize, FEED_ORDER)
+
+    def cached_page(self, state, user_id, serialize):
+        # None when the page runs past the cached head, the database serves those
+        limit = get_limit()
+        after = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                values = decode_cursor(cursor)
+                if not isinstance(values, list) or len(values) != len(FEED_ORDER):
+                    raise ValueError
+                after = feed_key(datetime.fromisoformat(values[0]), int(values[1]))
+            except (ValueError, TypeError):
+                abort(400, message="Invalid cursor")
+
+        feed = state.get(user_id) or state.load(user_id)
+        start = 0 if after is None else bisect_right(feed.keys, after)
+        rows = feed.rows[start:start + limit + 1]
+        if len(rows) <= limit and not feed.complete:
+            return None
+        return build_page(rows, FEED_ORDER, limit, serialize)
+
+    def added(self, user_id, bookmark_id):
+        state = self.state
+        user_id = as_id(user_id)
+        if state is None:
+            return
+        if state.get(user_id) is None:
+            state.written()
+            return
+        query, _ = feed_query(user_id)
+        row = query.filter(Bookmark.id == bookmark_id).first()
+        if row is not None:
+            state.insert(user_id, row)
+
+    def removed(self, user_id, project_id):
+        if self.state is not None:
+            self.state.remove(as_id(user_id), as_id(project_id))
+
+    def forget_users(self, *user_ids):
+        if self.state is not None:
+            user_ids = {as_id(user_id) for user_id in user_ids}
+            self.state.drop(lambda user_id, feed: user_id in user_ids)
+
+    def forget_projects(self, *project_ids):
+        # Title/image edits and cascaded deletes touch every feed holding the project
+        if self.state is not None:
+            project_ids = {as_id(project_id) for project_id in project_ids}
+            self.state.drop(lambda user_id, feed: any(row.project_id in project_ids for row in feed.rows))
+
+    def clear(self):
+        if self.state is not None:
+            self.state.drop(lambda user_id, feed: True)
+
+
+bookmark_feeds = BookmarkFeeds()
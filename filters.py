@@ -0,0 +1,83 @@
+from datetime import datetime
+from flask import request
+from flask_restful import abort
+from sqlalchemy import select
+from models import Project, ProjectSkill, Skill
+from pagination import bind_datetime
+
+# Query parameters that are handled by pagination, not by the filter DSL
+RESERVED = ('limit', 'cursor', 'sort')
+
+
+def parse_int(value):
+    return int(value)
+
+
+def parse_datetime(value):
+    return datetime.fromisoformat(value)
+
+
+class FilterSet:
+    # Declares which query parameters a listing accepts, how they are parsed
+    # and the indexed SQL predicate each one maps onto
+
+    def __init__(self, model, filters, sorts, default_sort):
+        self.model = model
+        self.filters = filters
+        self.sorts = sorts
+        self.default_sort = default_sort
+
+    def criteria(self, args=None):
+        args = request.args if args is None else args
+        unknown = [name for name in args if name not in self.filters and name not in RESERVED]
+        if unknown:
+            abort(400, message=f"Unknown filter {', '.join(sorted(unknown))}; allowed: {', '.join(self.filters)}")
+
+        clauses = []
+        for name, (parse, predicate) in self.filters.items():
+            for raw in args.getlist(name):
+                try:
+                    value = parse(raw)
+                except (TypeError, ValueError):
+                    abort(400, message=f"Invalid value for '{name}'")
+                clauses.append(predicate(value))
+        return clauses
+
+    def order(self, args=None):
+        # sort=-title sorts descending; id is always the final tiebreaker
+        sort = (request.args if args is None else args).get('sort', self.default_sort)
+        descending = sort.startswith('-')
+        key = sort.lstrip('-')
+        if key not in self.sorts:
+            abort(400, message=f"Invalid sort; allowed: {', '.join(self.sorts)}")
+        column = self.sorts[key]
+        if column is self.model.id:
+            return [(column, descending)]
+        return [(column, descending), (self.model.id, descending)]
+
+
+def skill_projects(name):
+    return select(ProjectSkill.project_id).join(Skill, Skill.id == ProjectSkill.skill_id).where(Skill.name == name)
+
+
+project_filters = FilterSet(
+    Project,
+    filters={
+        # ix_projects_user_id
+        'user_id': (parse_int, lambda value: Project.user_id == value),
+        # skills.name -> ix_project_skills_skill_id -> projects by id, so the cost
+        # follows the skill's projects, not the table; repeating the parameter
+        # requires every listed skill
+        'skill': (str, lambda value: Project.id.in_(skill_projects(value))),
+        # ix_projects_created_at
+        'created_after': (parse_datetime, lambda value: Project.created_at > bind_datetime(value)),
+        'created_before': (parse_datetime, lambda value: Project.created_at < bind_datetime(value)),
+    },
+    sorts={
+        'created_at': Project.created_at,
+        'title': Project.title,
+        'bookmark_count': Project.bookmark_count,
+        'id': Project.id,
+    },
+    default_sort='created_at',
+)
@@ -0,0 +1,37 @@
+# Gunicorn settings for the production profile, all overridable from env.
+# Each worker holds its own SQLAlchemy pool, so keep DB_POOL_SIZE at or
+# above GUNICORN_THREADS and workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# under the database's connection limit.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# Threaded sync workers: requests mostly wait on the database, so a few
+# threads per process overlap that I/O without the cost of more processes
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to cap slow memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = 200
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() in ('1', 'true', 'yes')
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Connections must never be shared across a fork; drop any the master opened
+    if not server.cfg.preload_app:
+        return
+    from models import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose(close=False)
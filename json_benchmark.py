@@ -0,0 +1,89 @@
+"""Micro-benchmark for response encoding on 10k-row listings.
+
+Compares the old path (Schema serializer calling isoformat() on every
+datetime, then Flask-RESTful's json.dumps) with representations.dumps on
+rows that keep their native datetimes, for both the orjson and the stdlib
+backend. Rows come from the comments table when --database is given,
+otherwise they are synthesized in memory.
+
+Usage: python json_benchmark.py [--database sqlite:////tmp/bench.db] [--rows 10000]
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from representations import BACKENDS
+
+FIELDS = ("id", "user_id", "project_id", "content", "created_at", "updated_at")
+
+
+def database_rows(database, count):
+    from app import create_app
+    from config import Config, engine_options
+    from schemas import comment_schema
+
+    class RowsConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(database)
+
+    with create_app(RowsConfig).app_context():
+        return comment_schema.query(*FIELDS).limit(count).all()
+
+
+def synthetic_rows(count):
+    start = datetime(2024, 1, 1)
+    return [SimpleNamespace(id=i, user_id=i % 977, project_id=i % 4093,
+                            content=f"Comment number {i} with a sentence or two of text in it.",
+                            created_at=start + timedelta(seconds=i * 37), updated_at=start + timedelta(seconds=i * 41))
+            for i in range(1, count + 1)]
+
+
+def isoformat_serialize(row):
+    # Schema.serializer before native datetimes
+    item = {}
+    for name in FIELDS:
+        value = getattr(row, name)
+        item[name] = value.isoformat() if isinstance(value, datetime) else value
+    return item
+
+
+def native_serialize(row):
+    return {name: getattr(row, name) for name in FIELDS}
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = database_rows(args.database, args.rows) if args.database else synthetic_rows(args.rows)
+    page = {"limit": len(rows), "next_cursor": None}
+
+    results = {
+        "rows": len(rows),
+        "source": "database" if args.database else "synthetic",
+        "isoformat + json.dumps (before)": timed(
+            lambda: json.dumps(dict(page, items=[isoformat_serialize(row) for row in rows])) + "\n", args.repeat),
+    }
+    for name, encode in BACKENDS.items():
+        results[f"native + {name}"] = timed(
+            lambda: encode(dict(page, items=[native_serialize(row) for row in rows])), args.repeat)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
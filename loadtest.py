@@ -0,0 +1,66 @@
+"""Small closed-loop HTTP load generator for comparing serving profiles.
+
+Usage: python loadtest.py http://127.0.0.1:8000 --clients 32 --seconds 20
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.request
+
+PATHS = ['/projects', '/projects/1', '/skill', '/comment?project_id=1', '/projectskill', '/user/1']
+
+
+def worker(base_url, deadline, latencies, errors):
+    i = 0
+    while time.monotonic() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base_url + path, timeout=10) as response:
+                response.read()
+        except urllib.error.HTTPError as error:
+            if error.code >= 500:
+                errors.append(path)
+        except Exception:
+            errors.append(path)
+        latencies.append(time.perf_counter() - started)
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('base_url')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=20)
+    args = parser.parse_args()
+
+    latencies, errors = [], []
+    deadline = time.monotonic() + args.seconds
+    threads = [threading.Thread(target=worker, args=(args.base_url.rstrip('/'), deadline, latencies, errors))
+               for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps({
+        "clients": args.clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / args.seconds, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
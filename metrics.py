@@ -0,0 +1,207 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger('portfoliopro.slow_query')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (1, 10, 50, 100, 200, 500, 1000, 5000)
+
+HISTOGRAMS = {
+    'portfoliopro_request_duration_seconds': ('Wall time per request', LATENCY_BUCKETS),
+    'portfoliopro_request_db_duration_seconds': ('Time spent in SQL per request', LATENCY_BUCKETS),
+    'portfoliopro_request_queries': ('SQL statements per request', QUERY_BUCKETS),
+    'portfoliopro_request_rows': ('Rows returned per request', ROW_BUCKETS),
+}
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+class Registry:
+    # Per-app histograms keyed by (metric, endpoint, method)
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.histograms = {}
+        self.requests = {}
+        self.query_errors = {}
+        self.lock = threading.Lock()
+
+    def observe(self, endpoint, method, status, wall, db_time, queries, rows):
+        values = {
+            'portfoliopro_request_duration_seconds': wall,
+            'portfoliopro_request_db_duration_seconds': db_time,
+            'portfoliopro_request_queries': queries,
+            'portfoliopro_request_rows': rows,
+        }
+        with self.lock:
+            for name, value in values.items():
+                if value is None:
+                    continue
+                key = (name, endpoint, method)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(HISTOGRAMS[name][1])
+                self.histograms[key].observe(value)
+            counter = (endpoint, method, status)
+            self.requests[counter] = self.requests.get(counter, 0) + 1
+
+    def observe_query_error(self, endpoint, method, error):
+        with self.lock:
+            counter = (endpoint, method, error)
+            self.query_errors[counter] = self.query_errors.get(counter, 0) + 1
+
+    def render(self):
+        # Prometheus text exposition format
+        lines = []
+        with self.lock:
+            for name, (help_text, _) in HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, endpoint, method), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    labels = f'endpoint="{endpoint}",method="{method}"'
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.total}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.total}')
+            lines.append("# HELP portfoliopro_requests_total Requests by endpoint, method and status")
+            lines.append("# TYPE portfoliopro_requests_total counter")
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'portfoliopro_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+            lines.append("# HELP portfoliopro_query_errors_total Failed SQL statements by endpoint, method and error")
+            lines.append("# TYPE portfoliopro_query_errors_total counter")
+            for (endpoint, method, error), count in sorted(self.query_errors.items()):
+                lines.append(f'portfoliopro_query_errors_total{{endpoint="{endpoint}",method="{method}",error="{error}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def endpoint_name():
+    # Flask-RESTful views carry their Resource class, e.g. "UserData"
+    view = current_app.view_functions.get(request.endpoint)
+    view_class = getattr(view, 'view_class', None)
+    if view_class is not None:
+        return view_class.__name__
+    return request.endpoint or 'unmatched'
+
+
+def record_rows(count):
+    # Called by listing helpers so the request histogram knows how many rows went out
+    if has_request_context():
+        g.metrics_rows = getattr(g, 'metrics_rows', 0) + count
+
+
+def caller_frame():
+    # Innermost frame in app.py, falling back to any module of this project
+    frames = [frame for frame in traceback.extract_stack()
+              if frame.filename.startswith(APP_DIR) and not frame.filename.endswith('metrics.py')]
+    for frame in reversed(frames):
+        if os.path.basename(frame.filename) == 'app.py':
+            return frame
+    return frames[-1] if frames else None
+
+
+class Metrics:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SLOW_QUERY_MS', 200)
+        slow_query_ms = app.config['SLOW_QUERY_MS']
+        registry = Registry(float(slow_query_ms) if slow_query_ms else None)
+        app.extensions['metrics'] = registry
+
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+        event.listen(engine, 'handle_error', self.handle_error)
+
+    @property
+    def registry(self):
+        return current_app.extensions['metrics']
+
+    def start_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_time = 0.0
+        g.metrics_queries = 0
+
+    def finish_request(self, response):
+        started = getattr(g, 'metrics_started', None)
+        if started is None:
+            return response
+        wall = time.perf_counter() - started
+        db_time, queries = g.metrics_db_time, g.metrics_queries
+        rows = getattr(g, 'metrics_rows', None)
+
+        self.registry.observe(endpoint_name(), request.method.lower(), response.status_code, wall, db_time, queries, rows)
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={wall * 1000:.1f}, db;dur={db_time * 1000:.1f};desc="{queries} queries"',
+        )
+        return response
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_started'].pop()
+        if not has_request_context():
+            return
+        self.count_statement(elapsed)
+
+        slow_query_ms = self.registry.slow_query_ms
+        if slow_query_ms is not None and elapsed * 1000 >= slow_query_ms:
+            frame = caller_frame()
+            where = f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}" if frame else "unknown"
+            logger.warning("slow query %.1f ms at %s [%s %s]: %s",
+                           elapsed * 1000, where, request.method, request.path, statement)
+
+    def handle_error(self, context):
+        # after_cursor_execute never runs for a statement that raises, so its
+        # start time is popped here; connect errors have no statement to pop
+        started = context.connection.info.get('metrics_started') if context.connection is not None else None
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        if not has_request_context():
+            return
+        self.count_statement(elapsed)
+        self.registry.observe_query_error(endpoint_name(), request.method.lower(),
+                                          type(context.original_exception).__name__)
+
+    def count_statement(self, elapsed):
+        g.metrics_db_time = getattr(g, 'metrics_db_time', 0.0) + elapsed
+        g.metrics_queries = getattr(g, 'metrics_queries', 0) + 1
+
+    def render(self):
+        return Response(self.registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+metrics = Metrics()
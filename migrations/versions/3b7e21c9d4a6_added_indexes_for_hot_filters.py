@@ -0,0 +1,52 @@
+"""added indexes for hot filters
+
+Revision ID: 3b7e21c9d4a6
+Revises: 1cc76ada29b2
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e21c9d4a6'
+down_revision = '1cc76ada29b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # drop duplicate bookmarks so the unique constraint can be created
+    op.execute(
+        "DELETE FROM bookmarks WHERE id NOT IN "
+        "(SELECT MIN(id) FROM bookmarks GROUP BY user_id, project_id)"
+    )
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_user_bookmark', ['user_id', 'project_id'])
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_project_id_created_at', ['project_id', 'created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_comments_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_projects_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('project_skills', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_project_skills_skill_id'), ['skill_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('project_skills', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_project_skills_skill_id'))
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_projects_user_id'))
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_comments_user_id'))
+        batch_op.drop_index('ix_comments_project_id_created_at')
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_user_bookmark', type_='unique')
@@ -0,0 +1,64 @@
+"""added full text search
+
+Revision ID: 4d2a9e6f1c85
+Revises: 3b7e21c9d4a6
+Create Date: 2026-10-18 11:03:27.540918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2a9e6f1c85'
+down_revision = '3b7e21c9d4a6'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = {
+    'projects': ('title', 'description'),
+    'skills': ('name', 'details'),
+    'comments': ('content',),
+}
+
+
+def tsvector(columns):
+    joined = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+    return f"to_tsvector('english', {joined})"
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for table, columns in SEARCH_COLUMNS.items():
+        if dialect == 'postgresql':
+            op.execute(f"CREATE INDEX ix_{table}_fts ON {table} USING GIN ({tsvector(columns)})")
+            continue
+        if dialect != 'sqlite':
+            continue
+
+        # external content FTS5 table, kept in sync by triggers and backfilled with 'rebuild'
+        fts = f"{table}_fts"
+        cols = ', '.join(columns)
+        new = ', '.join(f"new.{c}" for c in columns)
+        old = ', '.join(f"old.{c}" for c in columns)
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id')")
+        op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                   f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END")
+        op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                   f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END")
+        op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+                   f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                   f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END")
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for table in SEARCH_COLUMNS:
+        if dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_fts")
+        elif dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
@@ -0,0 +1,37 @@
+"""added project counters
+
+Revision ID: 6f1d4b8a2c39
+Revises: 5a8c3f0e9b27
+Create Date: 2026-10-18 13:41:52.803716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1d4b8a2c39'
+down_revision = '5a8c3f0e9b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('bookmark_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.create_index(batch_op.f('ix_projects_bookmark_count'), ['bookmark_count'], unique=False)
+
+    # backfill from the existing rows
+    op.execute(
+        "UPDATE projects SET "
+        "bookmark_count = (SELECT COUNT(*) FROM bookmarks WHERE bookmarks.project_id = projects.id), "
+        "comment_count = (SELECT COUNT(*) FROM comments WHERE comments.project_id = projects.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_projects_bookmark_count'))
+        batch_op.drop_column('comment_count')
+        batch_op.drop_column('bookmark_count')
@@ -0,0 +1,26 @@
+"""added bookmark feed index
+
+Revision ID: 8e4b2d7f1a63
+Revises: 6f1d4b8a2c39
+Create Date: 2026-10-18 18:52:14.604113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b2d7f1a63'
+down_revision = '6f1d4b8a2c39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.create_index('ix_bookmarks_user_id_created_at', ['user_id', sa.text('created_at DESC'), 'project_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookmarks_user_id_created_at')
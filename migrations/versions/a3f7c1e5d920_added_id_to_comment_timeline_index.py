@@ -0,0 +1,30 @@
+"""added id to comment timeline index
+
+Revision ID: a3f7c1e5d920
+Revises: 8e4b2d7f1a63
+Create Date: 2026-10-18 19:20:41.337920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f7c1e5d920'
+down_revision = '8e4b2d7f1a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The timeline seeks on (project_id, created_at, id); SQLite already
+    # appends the rowid, other databases need id in the index
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_project_id_created_at_id', ['project_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_comments_project_id_created_at')
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_project_id_created_at', ['project_id', 'created_at'], unique=False)
+        batch_op.drop_index('ix_comments_project_id_created_at_id')
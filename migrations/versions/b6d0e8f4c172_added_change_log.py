@@ -0,0 +1,32 @@
+"""added change log
+
+Revision ID: b6d0e8f4c172
+Revises: a3f7c1e5d920
+Create Date: 2026-10-18 19:48:09.215534
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d0e8f4c172'
+down_revision = 'a3f7c1e5d920'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('changes',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('resource', sa.String(length=32), nullable=False),
+    sa.Column('resource_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(length=16), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+
+
+def downgrade():
+    op.drop_table('changes')
@@ -0,0 +1,53 @@
+"""added keyset order indexes
+
+Revision ID: c4e9a2b7d315
+Revises: b6d0e8f4c172
+Create Date: 2026-10-18 21:12:40.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a2b7d315'
+down_revision = 'b6d0e8f4c172'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Collection GETs page on (created_at, id); without these every page sorts
+    # the whole table, or every row of the user
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.create_index('ix_skills_created_at_id', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.create_index('ix_bookmarks_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_bookmarks_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+    # (user_id, created_at, id) also serves plain user_id lookups
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_comments_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_comments_user_id')
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_user_id', ['user_id'], unique=False)
+        batch_op.drop_index('ix_comments_user_id_created_at_id')
+        batch_op.drop_index('ix_comments_created_at_id')
+
+    with op.batch_alter_table('bookmarks', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookmarks_user_id_created_at_id')
+        batch_op.drop_index('ix_bookmarks_created_at_id')
+
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.drop_index('ix_skills_created_at_id')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_created_at_id')
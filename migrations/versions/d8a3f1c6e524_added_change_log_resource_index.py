@@ -0,0 +1,27 @@
+"""added change log resource index
+
+Revision ID: d8a3f1c6e524
+Revises: c4e9a2b7d315
+Create Date: 2026-10-18 21:40:05.771942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a3f1c6e524'
+down_revision = 'c4e9a2b7d315'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Conditional GETs read each table's newest change from this index
+    with op.batch_alter_table('changes', schema=None) as batch_op:
+        batch_op.create_index('ix_changes_resource_seq', ['resource', 'seq'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_changes_resource_seq')
@@ -0,0 +1,53 @@
+"""limited fts update triggers
+
+Revision ID: e2b7c9d4f618
+Revises: d8a3f1c6e524
+Create Date: 2026-10-18 22:05:51.204776
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c9d4f618'
+down_revision = 'd8a3f1c6e524'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_COLUMNS = {
+    'projects': ('title', 'description'),
+    'skills': ('name', 'details'),
+    'comments': ('content',),
+}
+
+
+def update_trigger(table, columns, of_columns):
+    fts = f"{table}_fts"
+    cols = ', '.join(columns)
+    new = ', '.join(f"new.{c}" for c in columns)
+    old = ', '.join(f"old.{c}" for c in columns)
+    of = f" OF {cols}" if of_columns else ''
+    return (f"CREATE TRIGGER {fts}_au AFTER UPDATE{of} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END")
+
+
+def replace_update_triggers(of_columns):
+    # Only SQLite keeps the search index with triggers
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table, columns in SEARCH_COLUMNS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_au")
+        op.execute(update_trigger(table, columns, of_columns))
+
+
+def upgrade():
+    # Counter bumps update projects on every bookmark and comment; only a
+    # change to an indexed column should rewrite the FTS row
+    replace_update_triggers(True)
+
+
+def downgrade():
+    replace_update_triggers(False)
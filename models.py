@@ -13,13 +13,16 @@ class User(db.Model):
     role = db.Column(db.String(80), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
-    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
     #relationships
     projects = db.relationship('Project', backref='user', lazy=True)
     bookmarks = db.relationship('Bookmark', back_populates='user', lazy=True)
     comments = db.relationship('Comment', back_populates='user', lazy=True)
 
+# Keyset pages walk (created_at, id); the same index serves every page
+db.Index('ix_users_created_at_id', User.created_at, User.id)
+
 def get_user_by_email(email):
     return User.query.filter_by(email=email).first()
 
@@ -30,9 +33,9 @@ class Skill(db.Model):
     name = db.Column(db.String(80), unique=True, nullable=False)
     details = db.Column( db.Text, nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
-    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
 
-    
+db.Index('ix_skills_created_at_id', Skill.created_at, Skill.id)
     
 
 class Project(db.Model):
@@ -41,9 +44,12 @@ class Project(db.Model):
     title = db.Column(db.String(80), unique=True, nullable=False)
     description = db.Column(db.String(300), nullable=False)
     image = db.Column(db.String(355), nullable=False, server_default='default.jpg')
-    created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), index=True)
     updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    #denormalized counters, kept in step by the bookmark and comment handlers
+    bookmark_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
    
    #relationships
     skills = db.relationship('Skill', secondary='project_skills', backref=db.backref('projects', lazy='dynamic'))
@@ -57,7 +63,9 @@ class ProjectSkill(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     #relationships
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False )
-    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False, index=True)
+    project = db.relationship('Project', lazy=True, overlaps='skills,projects')
+    skill = db.relationship('Skill', lazy=True, overlaps='skills,projects')
 
 
     #uniqueconstraint
@@ -75,6 +83,14 @@ class Bookmark(db.Model):
     user = db.relationship('User', back_populates='bookmarks', lazy=True)
     project = db.relationship('Project', back_populates='bookmarks', lazy=True)
 
+    #uniqueconstraint
+    __table_args__ = (db.UniqueConstraint('user_id', 'project_id', name='unique_user_bookmark'),)
+
+# Covers the bookmark feed: newest first per user, project_id for the join
+db.Index('ix_bookmarks_user_id_created_at', Bookmark.user_id, Bookmark.created_at.desc(), Bookmark.project_id)
+db.Index('ix_bookmarks_created_at_id', Bookmark.created_at, Bookmark.id)
+db.Index('ix_bookmarks_user_id_created_at_id', Bookmark.user_id, Bookmark.created_at, Bookmark.id)
+
 class Comment(db.Model):
     __tablename__ = 'comments'
     id = db.Column(db.Integer, primary_key=True)
@@ -82,8 +98,31 @@ class Comment(db.Model):
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
-    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     #relationships
     user = db.relationship('User', back_populates='comments', lazy=True)
     project = db.relationship('Project', back_populates='comments', lazy=True)
-     
\ No newline at end of file
+
+    #indexes
+    # keyset order (created_at, id), alone and per project or user
+    __table_args__ = (
+        db.Index('ix_comments_project_id_created_at_id', 'project_id', 'created_at', 'id'),
+        db.Index('ix_comments_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_comments_created_at_id', 'created_at', 'id'),
+    )
+
+class Change(db.Model):
+    # Append-only log of writes, read by GET /changes; seq only ever grows
+    __tablename__ = 'changes'
+    seq = db.Column(db.Integer, primary_key=True)
+    resource = db.Column(db.String(32), nullable=False)
+    resource_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(16), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=db.func.current_timestamp())
+
+    # AUTOINCREMENT keeps SQLite from reusing a seq after the newest row is pruned;
+    # (resource, seq) gives conditional GETs each table's newest change in one seek
+    __table_args__ = (
+        db.Index('ix_changes_resource_seq', 'resource', 'seq'),
+        {'sqlite_autoincrement': True},
+    )
@@ -0,0 +1,135 @@
+import base64
+import json
+from datetime import datetime
+from flask import request
+from flask_restful import abort
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from models import db
+from metrics import record_rows
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def encode_cursor(values):
+    # Opaque cursor: urlsafe base64 of the last row's sort key
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def get_limit(args=None):
+    limit = (request.args if args is None else args).get('limit', DEFAULT_LIMIT)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        abort(400, message="'limit' must be an integer")
+    if limit < 1:
+        abort(400, message="'limit' must be at least 1")
+    return min(limit, MAX_LIMIT)
+
+
+def sort_columns(model):
+    # Keyset order is (created_at, id); tables without created_at fall back to id
+    if hasattr(model, 'created_at'):
+        return [model.created_at, model.id]
+    return [model.id]
+
+
+class normalized_datetime(FunctionElement):
+    # SQLite stores CURRENT_TIMESTAMP as text without microseconds, so bound
+    # values go through datetime() there to keep ties comparable; other
+    # databases get the plain parameter. Compiled per dialect, so it also
+    # works on sessions outside Flask-SQLAlchemy.
+    type = db.DateTime()
+    name = 'normalized_datetime'
+    inherit_cache = True
+
+
+@compiles(normalized_datetime)
+def compile_normalized_datetime(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(normalized_datetime, 'sqlite')
+def compile_normalized_datetime_sqlite(element, compiler, **kw):
+    return f"datetime({compiler.process(element.clauses, **kw)})"
+
+
+def bind_datetime(value):
+    return normalized_datetime(value)
+
+
+def bind_value(column, value):
+    if isinstance(column.type, db.DateTime):
+        return bind_datetime(datetime.fromisoformat(value))
+    return value
+
+
+def keyset_filter(order, values):
+    # (a, b, c) after (x, y, z) expands to a > x OR (a = x AND b > y) OR ...,
+    # with < instead of > for descending keys
+    bound = [bind_value(column, value) for (column, _), value in zip(order, values)]
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        ties = [order[j][0] == bound[j] for j in range(i)]
+        after = column < bound[i] if descending else column > bound[i]
+        clauses.append(and_(*ties, after))
+    if len(order) == 1:
+        return clauses[0]
+    # Redundant bound on the leading key so the index seeks to the cursor
+    # instead of filtering every row before it
+    column, descending = order[0]
+    return and_(column <= bound[0] if descending else column >= bound[0], or_(*clauses))
+
+
+def page_statement(query, model, order=None, args=None):
+    # Applies the cursor, sort order and limit + 1 to a Query or select();
+    # order is a list of (column, descending) pairs ending in a unique column,
+    # (created_at, id) by default
+    args = request.args if args is None else args
+    limit = get_limit(args)
+    order = order or [(column, False) for column in sort_columns(model)]
+
+    cursor = args.get('cursor')
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+            if not isinstance(values, list) or len(values) != len(order):
+                raise ValueError
+            query = query.filter(keyset_filter(order, values))
+        except (ValueError, TypeError):
+            abort(400, message="Invalid cursor")
+
+    query = query.order_by(*(column.desc() if descending else column for column, descending in order)).limit(limit + 1)
+    return query, order, limit
+
+
+def build_page(rows, order, limit, serialize):
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    record_rows(len(rows))
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        key = [getattr(last, column.key) for column, _ in order]
+        next_cursor = encode_cursor([v.isoformat() if isinstance(v, datetime) else v for v in key])
+
+    return {
+        "items": [serialize(row) for row in rows],
+        "limit": limit,
+        "next_cursor": next_cursor,
+    }
+
+
+def paginate(query, model, serialize, order=None):
+    # Shared keyset pagination for every collection GET
+    query, order, limit = page_statement(query, model, order)
+    return build_page(query.all(), order, limit, serialize)
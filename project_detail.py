@@ -0,0 +1,121 @@
+import json
+from datetime import datetime
+from flask import request
+from flask_restful import abort
+from sqlalchemy import text
+from models import db, User, Project, Comment, ProjectSkill, Skill
+from pagination import decode_cursor, encode_cursor, get_limit, paginate
+from schemas import Schema
+
+comment_with_username_schema = Schema(Comment, {
+    "id": Comment.id,
+    "user_id": Comment.user_id,
+    "username": User.username,
+    "content": Comment.content,
+    "created_at": Comment.created_at,
+    "updated_at": Comment.updated_at,
+}, joins={
+    "username": (User, Comment.user_id == User.id, False),
+})
+
+PROJECT_FIELDS = ("id", "title", "description", "image", "user_id", "created_at", "updated_at")
+COMMENT_FIELDS = ("id", "user_id", "username", "content", "created_at")
+
+
+def load_batched(project_id):
+    # Three indexed queries: project + owner, skills, first comment page
+    row = db.session.query(
+        *(getattr(Project, field).label(field) for field in PROJECT_FIELDS),
+        Project.bookmark_count, Project.comment_count,
+        User.username, User.role,
+    ).join(User, Project.user_id == User.id).filter(Project.id == project_id).first()
+    if row is None:
+        return None
+
+    skills = db.session.query(Skill.id, Skill.name).join(ProjectSkill, ProjectSkill.skill_id == Skill.id) \
+        .filter(ProjectSkill.project_id == project_id).order_by(Skill.name).all()
+
+    query, serialize = comment_with_username_schema.listing(*COMMENT_FIELDS)
+    comments = paginate(query.filter(Comment.project_id == project_id), Comment, serialize)
+
+    return {
+        "project": {field: getattr(row, field) for field in PROJECT_FIELDS},
+        "owner": {"id": row.user_id, "username": row.username, "role": row.role},
+        "skills": [{"id": skill.id, "name": skill.name} for skill in skills],
+        "comments": comments,
+        "counts": {"bookmarks": row.bookmark_count, "comments": row.comment_count},
+    }
+
+
+POSTGRES_DETAIL = """
+WITH p AS (
+    SELECT projects.id, projects.title, projects.description, projects.image, projects.user_id,
+           projects.created_at, projects.updated_at, projects.bookmark_count, projects.comment_count,
+           users.username, users.role
+    FROM projects JOIN users ON users.id = projects.user_id
+    WHERE projects.id = :project_id
+), s AS (
+    SELECT coalesce(json_agg(json_build_object('id', skills.id, 'name', skills.name) ORDER BY skills.name), '[]') AS skills
+    FROM project_skills JOIN skills ON skills.id = project_skills.skill_id
+    WHERE project_skills.project_id = :project_id
+), c AS (
+    SELECT coalesce(json_agg(row_to_json(page) ORDER BY page.created_at, page.id), '[]') AS comments
+    FROM (
+        SELECT comments.id, comments.user_id, users.username, comments.content, comments.created_at
+        FROM comments JOIN users ON users.id = comments.user_id
+        WHERE comments.project_id = :project_id{after}
+        ORDER BY comments.created_at, comments.id
+        LIMIT :limit
+    ) AS page
+)
+SELECT p.*, s.skills, c.comments FROM p, s, c
+"""
+# Same keyset as paginate(): the row comparison seeks ix_comments_project_id_created_at_id
+AFTER_CURSOR = " AND (comments.created_at, comments.id) > (:after_created_at, :after_id)"
+FIRST_PAGE = text(POSTGRES_DETAIL.format(after=''))
+NEXT_PAGE = text(POSTGRES_DETAIL.format(after=AFTER_CURSOR))
+
+
+def comment_cursor():
+    # (created_at, id) of the last comment on the previous page, None on the first
+    cursor = request.args.get('cursor')
+    if not cursor:
+        return None
+    try:
+        created_at, comment_id = decode_cursor(cursor)
+        return datetime.fromisoformat(created_at), int(comment_id)
+    except (ValueError, TypeError):
+        abort(400, message="Invalid cursor")
+
+
+def load_json_aggregate(project_id):
+    # One round-trip: the database assembles skills and comments as JSON
+    limit = get_limit()
+    after = comment_cursor()
+    params = {"project_id": project_id, "limit": limit + 1}
+    if after is not None:
+        params.update(after_created_at=after[0], after_id=after[1])
+    row = db.session.execute(NEXT_PAGE if after else FIRST_PAGE, params).mappings().first()
+    if row is None:
+        return None
+
+    skills = row["skills"] if isinstance(row["skills"], list) else json.loads(row["skills"])
+    comments = row["comments"] if isinstance(row["comments"], list) else json.loads(row["comments"])
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor([comments[-1]["created_at"], comments[-1]["id"]])
+
+    return {
+        "project": {field: row[field] for field in PROJECT_FIELDS},
+        "owner": {"id": row["user_id"], "username": row["username"], "role": row["role"]},
+        "skills": skills,
+        "comments": {"items": comments, "limit": limit, "next_cursor": next_cursor},
+        "counts": {"bookmarks": row["bookmark_count"], "comments": row["comment_count"]},
+    }
+
+
+def load_project_detail(project_id):
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return load_json_aggregate(project_id)
+    return load_batched(project_id)
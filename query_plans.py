@@ -0,0 +1,63 @@
+from sqlalchemy import text
+from werkzeug.datastructures import MultiDict
+from filters import project_filters
+from models import db, User, Project, Comment, ProjectSkill, Skill, Bookmark
+
+
+def hot_queries():
+    # The filters the Resources in app.py run on every request
+    return {
+        "bookmarks(user_id, project_id)": Bookmark.query.filter_by(user_id=1, project_id=1),
+        "bookmarks(user_id, created_at DESC)": Bookmark.query.filter_by(user_id=1).order_by(Bookmark.created_at.desc(), Bookmark.project_id),
+        "comments(project_id, created_at, id)": Comment.query.filter_by(project_id=1).order_by(Comment.created_at.desc(), Comment.id.desc()),
+        "comments(user_id)": Comment.query.filter_by(user_id=1),
+        "projects(user_id)": Project.query.filter_by(user_id=1),
+        "project_skills(skill_id)": ProjectSkill.query.filter_by(skill_id=1),
+        "projects(created_at)": Project.query.filter(Project.created_at > '2000-01-01'),
+        "projects ?skill=": Project.query.filter(*project_filters.criteria(MultiDict({'skill': 'python'}))),
+        "projects ?user_id=&skill=": Project.query.filter(*project_filters.criteria(MultiDict({'user_id': '1', 'skill': 'python'}))),
+        # Keyset pages: the index has to return rows in (created_at, id) order
+        "users page": keyset_page(User.query, User),
+        "skills page": keyset_page(Skill.query, Skill),
+        "comments page": keyset_page(Comment.query, Comment),
+        "comments ?user_id= page": keyset_page(Comment.query.filter_by(user_id=1), Comment),
+        "bookmarks page": keyset_page(Bookmark.query, Bookmark),
+        "bookmarks ?user_id= page": keyset_page(Bookmark.query.filter_by(user_id=1), Bookmark),
+    }
+
+
+def keyset_page(query, model):
+    return query.order_by(model.created_at, model.id).limit(51)
+
+
+def explain(query):
+    dialect = db.session.get_bind().dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        return [row[-1] for row in rows]
+    # Tiny tables make Postgres prefer a seq scan, so rule it out for the check
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    return [row[0] for row in db.session.execute(text(f"EXPLAIN {sql}")).fetchall()]
+
+
+def uses_index(plan):
+    for line in plan:
+        if line.startswith('SCAN ') and 'INDEX' not in line:
+            return False
+        # A full sort reads every matching row before the first one is returned
+        if line.startswith('USE TEMP B-TREE FOR ORDER BY') or line.lstrip(' ->').startswith('Sort '):
+            return False
+        if 'Seq Scan' in line:
+            return False
+    return True
+
+
+def check_query_plans():
+    # Returns {name: (uses_index, plan lines)} for every hot filter
+    results = {}
+    for name, query in hot_queries().items():
+        plan = explain(query)
+        results[name] = (uses_index(plan), plan)
+    db.session.rollback()
+    return results
@@ -0,0 +1,56 @@
+import json
+from datetime import date, datetime
+from flask import current_app, has_app_context
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder below produces the same output
+    orjson = None
+
+# One JSON encoder for every response body, cache entry and export stream.
+# Datetimes are written natively as ISO 8601 (2024-10-18T18:22:37, with
+# .ffffff only when there are microseconds), the same from both backends.
+
+
+def default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stdlib_dumps(data, pretty=False):
+    if pretty:
+        return json.dumps(data, default=default, ensure_ascii=False, indent=2).encode()
+    return json.dumps(data, default=default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def orjson_dumps(data, pretty=False):
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+    return orjson.dumps(data, default=default, option=option)
+
+
+BACKENDS = {'json': stdlib_dumps}
+if orjson is not None:
+    BACKENDS['orjson'] = orjson_dumps
+
+
+def backend_name():
+    # JSON_BACKEND picks an encoder explicitly; unset means the fastest installed one
+    name = current_app.config.get('JSON_BACKEND') if has_app_context() else None
+    name = name or ('orjson' if orjson is not None else 'json')
+    if name not in BACKENDS:
+        raise ValueError(f"JSON_BACKEND {name!r} is not available; installed: {', '.join(BACKENDS)}")
+    return name
+
+
+def dumps(data, pretty=False):
+    # Always bytes
+    return BACKENDS[backend_name()](data, pretty)
+
+
+def output_json(data, code, headers=None):
+    # Flask-RESTful representation for application/json; indented only in debug mode
+    body = dumps(data, pretty=current_app.debug) + b'\n'
+    response = current_app.response_class(body, status=code, mimetype='application/json')
+    response.headers.extend(headers or {})
+    return response
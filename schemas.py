@@ -0,0 +1,119 @@
+from sqlalchemy import select
+from models import db, User, Project, Comment, ProjectSkill, Skill, Bookmark
+
+
+class Schema:
+    # Read-only projection of a model: selects only the columns a response
+    # needs and turns result rows straight into JSON-ready dicts, without
+    # building ORM instances.
+
+    def __init__(self, model, fields, joins=None):
+        self.model = model
+        self.fields = fields
+        self.joins = joins or {}
+
+    def sort_keys(self):
+        # Always selected so pagination can build a cursor from the last row
+        if hasattr(self.model, 'created_at'):
+            return ['created_at', 'id']
+        return ['id']
+
+    def selected(self, names):
+        return list(names) + [key for key in self.sort_keys() if key not in names]
+
+    def join(self, query, selected):
+        # Several fields can come from the same joined table, it is joined once
+        joined = set()
+        for name in selected:
+            if name in self.joins:
+                target, onclause, outer = self.joins[name]
+                if target not in joined:
+                    joined.add(target)
+                    query = query.join(target, onclause, isouter=outer)
+        return query
+
+    def query(self, *names):
+        selected = self.selected(names)
+        return self.join(db.session.query(*(self.fields[name].label(name) for name in selected)).select_from(self.model), selected)
+
+    def select(self, *names):
+        # Same projection as a Core statement, for sessions outside Flask-SQLAlchemy
+        selected = self.selected(names)
+        return self.join(select(*(self.fields[name].label(name) for name in selected)).select_from(self.model), selected)
+
+    def serializer(self, *names):
+        names = tuple(names)
+
+        def serialize(row):
+            # Datetimes stay native, the JSON representation formats them
+            return {name: getattr(row, name) for name in names}
+
+        return serialize
+
+    def listing(self, *names):
+        return self.query(*names), self.serializer(*names)
+
+
+user_schema = Schema(User, {
+    "id": User.id,
+    "username": User.username,
+    "email": User.email,
+    "role": User.role,
+    "created_at": User.created_at,
+    "updated_at": User.updated_at,
+})
+
+project_schema = Schema(Project, {
+    "id": Project.id,
+    "title": Project.title,
+    "description": Project.description,
+    "image": Project.image,
+    "user_id": Project.user_id,
+    "bookmark_count": Project.bookmark_count,
+    "comment_count": Project.comment_count,
+    "created_at": Project.created_at,
+    "updated_at": Project.updated_at,
+})
+
+bookmark_schema = Schema(Bookmark, {
+    "id": Bookmark.id,
+    "user_id": Bookmark.user_id,
+    "project_id": Bookmark.project_id,
+    "project_title": Project.title,
+    "project_image": Project.image,
+    "created_at": Bookmark.created_at,
+}, joins={
+    "project_title": (Project, Bookmark.project_id == Project.id, True),
+    "project_image": (Project, Bookmark.project_id == Project.id, True),
+})
+
+comment_schema = Schema(Comment, {
+    "id": Comment.id,
+    "user_id": Comment.user_id,
+    "username": User.username,
+    "project_id": Comment.project_id,
+    "content": Comment.content,
+    "created_at": Comment.created_at,
+    "updated_at": Comment.updated_at,
+}, joins={
+    "username": (User, Comment.user_id == User.id, True),
+})
+
+skill_schema = Schema(Skill, {
+    "id": Skill.id,
+    "name": Skill.name,
+    "details": Skill.details,
+    "created_at": Skill.created_at,
+    "updated_at": Skill.updated_at,
+})
+
+project_skill_schema = Schema(ProjectSkill, {
+    "id": ProjectSkill.id,
+    "project_id": ProjectSkill.project_id,
+    "skill_id": ProjectSkill.skill_id,
+    "project_title": Project.title,
+    "skill_name": Skill.name,
+}, joins={
+    "project_title": (Project, ProjectSkill.project_id == Project.id, False),
+    "skill_name": (Skill, ProjectSkill.skill_id == Skill.id, False),
+})
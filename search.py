@@ -0,0 +1,138 @@
+import re
+from flask import request
+from flask_restful import abort
+from sqlalchemy import DDL, event, text
+from metrics import record_rows
+from models import db, Project, Skill, Comment
+from pagination import decode_cursor, encode_cursor, get_limit
+
+# Indexed text per table; SQLite keeps an FTS5 shadow table in sync with
+# triggers, Postgres indexes the same to_tsvector expression with GIN
+SEARCH_COLUMNS = {
+    'projects': ('title', 'description'),
+    'skills': ('name', 'details'),
+    'comments': ('content',),
+}
+
+SEARCH_TYPES = {'project': 'projects', 'skill': 'skills', 'comment': 'comments'}
+
+
+def sqlite_fts_ddl(table, columns):
+    fts = f"{table}_fts"
+    cols = ', '.join(columns)
+    new = ', '.join(f"new.{c}" for c in columns)
+    old = ', '.join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        # Only the indexed columns: counter bumps and updated_at leave the FTS row alone
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def tsvector(columns, alias=None):
+    prefix = f"{alias}." if alias else ''
+    joined = " || ' ' || ".join(f"coalesce({prefix}{c}, '')" for c in columns)
+    return f"to_tsvector('english', {joined})"
+
+
+def postgres_fts_ddl(table, columns):
+    return [f"CREATE INDEX IF NOT EXISTS ix_{table}_fts ON {table} USING GIN ({tsvector(columns)})"]
+
+
+# Keep the search index alongside tables built by db.create_all()
+for _model in (Project, Skill, Comment):
+    _table = _model.__tablename__
+    for _statement in sqlite_fts_ddl(_table, SEARCH_COLUMNS[_table]):
+        event.listen(_model.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+    for _statement in postgres_fts_ddl(_table, SEARCH_COLUMNS[_table]):
+        event.listen(_model.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def search_terms(q):
+    # Only word characters reach the query syntax, the last term matches as a prefix
+    return re.findall(r'\w+', q or '')[:16]
+
+
+def sqlite_query(terms, tables):
+    match = ' '.join(f'"{term}"' for term in terms) + '*'
+    selects = {
+        'projects': "SELECT 'project' AS type, p.id, p.title AS title, p.description AS text, p.id AS project_id, "
+                    "-bm25(projects_fts) AS score FROM projects_fts JOIN projects p ON p.id = projects_fts.rowid "
+                    "WHERE projects_fts MATCH :match",
+        'skills': "SELECT 'skill' AS type, s.id, s.name AS title, s.details AS text, NULL AS project_id, "
+                  "-bm25(skills_fts) AS score FROM skills_fts JOIN skills s ON s.id = skills_fts.rowid "
+                  "WHERE skills_fts MATCH :match",
+        'comments': "SELECT 'comment' AS type, c.id, NULL AS title, c.content AS text, c.project_id AS project_id, "
+                    "-bm25(comments_fts) AS score FROM comments_fts JOIN comments c ON c.id = comments_fts.rowid "
+                    "WHERE comments_fts MATCH :match",
+    }
+    return ' UNION ALL '.join(selects[table] for table in tables), {'match': match}
+
+
+def postgres_query(terms, tables):
+    tsquery = ' & '.join(terms) + ':*'
+    selects = {
+        'projects': f"SELECT 'project' AS type, p.id, p.title AS title, p.description AS text, p.id AS project_id, "
+                    f"ts_rank({tsvector(SEARCH_COLUMNS['projects'], 'p')}, q) AS score "
+                    f"FROM projects p, to_tsquery('english', :tsquery) q WHERE {tsvector(SEARCH_COLUMNS['projects'], 'p')} @@ q",
+        'skills': f"SELECT 'skill' AS type, s.id, s.name AS title, s.details AS text, NULL AS project_id, "
+                  f"ts_rank({tsvector(SEARCH_COLUMNS['skills'], 's')}, q) AS score "
+                  f"FROM skills s, to_tsquery('english', :tsquery) q WHERE {tsvector(SEARCH_COLUMNS['skills'], 's')} @@ q",
+        'comments': f"SELECT 'comment' AS type, c.id, NULL AS title, c.content AS text, c.project_id AS project_id, "
+                    f"ts_rank({tsvector(SEARCH_COLUMNS['comments'], 'c')}, q) AS score "
+                    f"FROM comments c, to_tsquery('english', :tsquery) q WHERE {tsvector(SEARCH_COLUMNS['comments'], 'c')} @@ q",
+    }
+    return ' UNION ALL '.join(selects[table] for table in tables), {'tsquery': tsquery}
+
+
+def search(q, search_type=None):
+    # Ranked, paginated search across projects, skills and comments
+    terms = search_terms(q)
+    if not terms:
+        abort(400, message="'q' must contain at least one word")
+    if search_type and search_type not in SEARCH_TYPES:
+        abort(400, message=f"'type' must be one of {', '.join(SEARCH_TYPES)}")
+    tables = [SEARCH_TYPES[search_type]] if search_type else list(SEARCH_COLUMNS)
+
+    limit = get_limit()
+    offset = decode_search_cursor()
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        sql, params = sqlite_query(terms, tables)
+    elif dialect == 'postgresql':
+        sql, params = postgres_query(terms, tables)
+    else:
+        abort(501, message=f"Search is not supported on {dialect}")
+
+    sql = f"SELECT * FROM ({sql}) AS results ORDER BY score DESC, type, id LIMIT :limit OFFSET :offset"
+    rows = db.session.execute(text(sql), dict(params, limit=limit + 1, offset=offset)).mappings().all()
+
+    has_more = len(rows) > limit
+    record_rows(min(len(rows), limit))
+    return {
+        "items": [dict(row) for row in rows[:limit]],
+        "limit": limit,
+        "next_cursor": encode_cursor([offset + limit]) if has_more else None,
+    }
+
+
+def decode_search_cursor():
+    # Ranked results page by offset, wrapped in the same opaque cursor format
+    cursor = request.args.get('cursor')
+    if not cursor:
+        return 0
+    try:
+        values = decode_cursor(cursor)
+        if not isinstance(values, list) or len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+            raise ValueError
+    except (ValueError, TypeError):
+        abort(400, message="Invalid cursor")
+    return values[0]
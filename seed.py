@@ -1,40 +1,33 @@
-from app import app, db
-from models import User, Project, Comment, Bookmark, Skill, ProjectSkill
-from faker import Faker
+from sqlalchemy import text
+from models import db, User, Project, Comment, Bookmark, Skill, ProjectSkill
+from synthetic import CHUNK_SIZE, generate
 
-fake = Faker()
+# Children first so foreign keys never point at deleted rows
+TABLES = (Bookmark, Comment, ProjectSkill, Project, Skill, User)
 
-with app.app_context():
-   
-   for _ in range(10):
-      user = User(
-         username= fake.user_name(),
-         email=fake.email(),
-         role= fake.random_element(elements=('admin','user')),
-         
-      )
-      db.session.add(user)
-      db.session.commit()
 
-   for  _ in range (10) : 
-      project = Project(
-         title = fake.word(),
-         description = fake.text(),
-         image =fake.image_url(),
-         user_id = fake.random_element(elements=(1,2,3,4,5,6))
+def truncate():
+    if db.session.get_bind().dialect.name == 'postgresql':
+        names = ', '.join(model.__tablename__ for model in TABLES)
+        db.session.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    else:
+        for model in TABLES:
+            db.session.query(model).delete(synchronize_session=False)
+    db.session.commit()
 
-      )
-      db.session.add(project)
-      db.session.commit()
 
-   for _ in range (10):
-      comment = Comment(
-         content = fake.text(),
-         user_id = fake.random_element(elements= (1,2,3,4,5,6)),
-         project_id = fake.random_element(elements=(1,2,3,4,5,6))
-      )
-      db.session.add(comment)
-      db.session.commit()
+def seed(users=50, projects=100, skills=20, comments=500, bookmarks=200,
+         seed=42, chunk_size=CHUNK_SIZE, reset=False, log=print):
+    if reset:
+        log("truncating all tables")
+        truncate()
+    return generate(users=users, projects=projects, skills=skills, comments=comments,
+                    bookmarks=bookmarks, seed=seed, chunk_size=chunk_size, log=log)
 
 
-         
\ No newline at end of file
+if __name__ == '__main__':
+    # Kept for `python seed.py`; `flask seed --help` has the knobs
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        print(seed())
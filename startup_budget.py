@@ -0,0 +1,67 @@
+"""Check how long it takes to import the API and build an app.
+
+Runs `python -X importtime` in a fresh interpreter, prints the slowest
+top-level imports and exits non-zero when import + create_app() goes over
+STARTUP_BUDGET_MS (default 1000), or when Alembic gets imported outside the
+CLI. Usage: python startup_budget.py
+"""
+import os
+import subprocess
+import sys
+
+BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 1000))
+LAZY_MODULES = ('alembic', 'flask_migrate')
+
+PROBE = (
+    "import time; started = time.perf_counter(); "
+    "import app; app.create_app(); "
+    "print('total_ms', (time.perf_counter() - started) * 1000)"
+)
+
+
+def measure():
+    env = dict(os.environ, DATABASE_URI=os.environ.get('DATABASE_URI', 'sqlite://'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    total_ms = float(result.stdout.split()[-1])
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((int(cumulative) / 1000, depth, name.strip()))
+    return total_ms, imports
+
+
+def problems(total_ms, imports):
+    # What main() fails on; tests/test_startup_budget.py asserts there is none
+    loaded = {name for _, _, name in imports}
+    eager = [module for module in LAZY_MODULES if module in loaded]
+    found = []
+    if eager:
+        found.append(f"{', '.join(eager)} imported at startup; keep it behind the CLI")
+    if total_ms > BUDGET_MS:
+        found.append(f"Startup took {total_ms:.0f} ms, over the {BUDGET_MS:.0f} ms budget")
+    return found
+
+
+def main():
+    total_ms, imports = measure()
+    direct = sorted(((ms, name) for ms, depth, name in imports if depth == 1), reverse=True)
+    for cumulative_ms, name in direct[:10]:
+        print(f"{cumulative_ms:8.1f} ms  {name}")
+    print(f"{total_ms:8.1f} ms  import app + create_app() (budget {BUDGET_MS:.0f} ms)")
+
+    found = problems(total_ms, imports)
+    if found:
+        sys.exit('\n'.join(found))
+
+
+if __name__ == '__main__':
+    main()
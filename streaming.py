@@ -0,0 +1,55 @@
+from flask import Response, stream_with_context
+from flask_restful import abort
+from pagination import sort_columns
+from representations import dumps
+
+YIELD_PER = 1000
+CHUNK_ROWS = 200
+
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+def iter_rows(query, model, serialize):
+    # Server-side cursor: rows are fetched YIELD_PER at a time, never all at once
+    for row in query.order_by(*sort_columns(model)).yield_per(YIELD_PER):
+        yield serialize(row)
+
+
+def ndjson_chunks(items):
+    chunk = []
+    for item in items:
+        chunk.append(dumps(item))
+        if len(chunk) >= CHUNK_ROWS:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
+
+def json_array_chunks(items):
+    # Open the array straight away so the client gets its first byte immediately
+    yield b'['
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(dumps(item))
+        if len(chunk) >= CHUNK_ROWS:
+            yield (b'' if first else b',') + b','.join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield (b'' if first else b',') + b','.join(chunk)
+    yield b']'
+
+
+def stream_export(query, model, serialize, export_format):
+    # Stream a whole collection as NDJSON or as a chunked JSON array
+    if export_format not in MIMETYPES:
+        abort(400, message="'format' must be 'ndjson' or 'json'")
+
+    items = iter_rows(query, model, serialize)
+    chunks = ndjson_chunks(items) if export_format == 'ndjson' else json_array_chunks(items)
+    return Response(stream_with_context(chunks), mimetype=MIMETYPES[export_format])
@@ -0,0 +1,193 @@
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from faker import Faker
+from sqlalchemy import Column, MetaData, String, Table, func, insert
+from models import db, User, Skill, Project, ProjectSkill, Bookmark, Comment
+
+# Synthetic, reproducible data at production scale: Faker only fills small
+# text pools, rows are assembled from them and written in chunked bulk
+# INSERT ... RETURNING statements, one transaction per chunk
+
+CHUNK_SIZE = 5000
+POOL_SIZE = 2000
+HISTORY_DAYS = 730
+SKEW = 0.8
+ADMIN_SHARE = 0.02
+MAX_SKILLS_PER_PROJECT = 5
+
+_raw_metadata = MetaData()
+
+
+def raw_table(model):
+    # Same table with DateTime columns bound as text, so generated timestamps
+    # are stored in the CURRENT_TIMESTAMP format the keyset cursors compare against
+    name = model.__tablename__
+    if name not in _raw_metadata.tables:
+        Table(name, _raw_metadata, *(
+            Column(column.name, String if isinstance(column.type, db.DateTime) else column.type,
+                   primary_key=column.primary_key)
+            for column in model.__table__.columns
+        ))
+    return _raw_metadata.tables[name]
+
+
+def timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class Popularity:
+    # Zipf-like sampler: a shuffled few indexes get most of the picks
+
+    def __init__(self, rng, size, skew=SKEW):
+        self.rng = rng
+        self.order = list(range(size))
+        rng.shuffle(self.order)
+        self.ranks = range(size)
+        self.cum_weights = list(accumulate(rank ** -skew for rank in range(1, size + 1)))
+
+    def sample(self, k):
+        return [self.order[rank] for rank in self.rng.choices(self.ranks, cum_weights=self.cum_weights, k=k)]
+
+
+def insert_chunks(model, count, make_row, chunk_size=CHUNK_SIZE):
+    # Returns the generated primary keys in row order
+    table = raw_table(model)
+    statement = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    ids = []
+    for start in range(0, count, chunk_size):
+        rows = [make_row(i) for i in range(start, min(start + chunk_size, count))]
+        ids.extend(db.session.execute(statement, rows).scalars())
+        db.session.commit()
+    return ids
+
+
+def next_suffix(model):
+    # Unique names keep working when generating on top of existing rows
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def unique_pairs(rng, count, left, right, limit):
+    # Samples `count` distinct (left, right) index pairs from two samplers
+    count = min(count, limit)
+    seen, pairs = set(), []
+    while len(pairs) < count:
+        for a, b in zip(left(count - len(pairs)), right(count - len(pairs))):
+            if (a, b) not in seen:
+                seen.add((a, b))
+                pairs.append((a, b))
+    return pairs
+
+
+def generate(users=1000, projects=2000, skills=100, comments=10000, bookmarks=5000,
+             seed=42, chunk_size=CHUNK_SIZE, now=None, log=None):
+    if projects and not users:
+        raise ValueError("Projects need at least one user to own them")
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+    log = log or (lambda message: None)
+
+    names = [fake.user_name() for _ in range(POOL_SIZE)]
+    words = [fake.word() for _ in range(POOL_SIZE)]
+    sentences = [fake.sentence(nb_words=14)[:300] for _ in range(POOL_SIZE)]
+    paragraphs = [fake.paragraph(nb_sentences=3) for _ in range(POOL_SIZE)]
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    start = now - timedelta(days=HISTORY_DAYS)
+    span = (now - start).total_seconds()
+
+    def after(moment):
+        return moment + timedelta(seconds=int(rng.random() * (now - moment).total_seconds()))
+
+    # Decide every relationship up front so the project counters can be
+    # written with the projects instead of recounted afterwards
+    project_owners = Popularity(rng, users).sample(projects) if users else []
+    project_rank = Popularity(rng, projects)
+    user_rank = Popularity(rng, users)
+    comment_targets = list(zip(project_rank.sample(comments), user_rank.sample(comments))) if projects and users else []
+    bookmark_pairs = unique_pairs(rng, bookmarks, project_rank.sample,
+                                  lambda k: [rng.randrange(users) for _ in range(k)], projects * users)
+    skill_rank = Popularity(rng, skills) if skills else None
+
+    comment_counts = [0] * projects
+    for project, _ in comment_targets:
+        comment_counts[project] += 1
+    bookmark_counts = [0] * projects
+    for project, _ in bookmark_pairs:
+        bookmark_counts[project] += 1
+
+    suffix = next_suffix(User)
+    user_created = [start + timedelta(seconds=int(rng.random() * span)) for _ in range(users)]
+    log(f"users: {users}")
+    user_ids = insert_chunks(User, users, lambda i: {
+        "username": f"{names[i % POOL_SIZE]}{suffix + i}",
+        "email": f"{names[i % POOL_SIZE]}{suffix + i}@example.com",
+        "role": 'admin' if rng.random() < ADMIN_SHARE else 'user',
+        "created_at": timestamp(user_created[i]),
+        "updated_at": timestamp(user_created[i]),
+    }, chunk_size)
+
+    suffix = next_suffix(Skill)
+    log(f"skills: {skills}")
+    skill_ids = insert_chunks(Skill, skills, lambda i: {
+        "name": f"{words[i % POOL_SIZE]}-{suffix + i}",
+        "details": sentences[rng.randrange(POOL_SIZE)],
+        "created_at": timestamp(start),
+        "updated_at": timestamp(start),
+    }, chunk_size)
+
+    suffix = next_suffix(Project)
+    project_created = [after(user_created[owner]) for owner in project_owners]
+    log(f"projects: {projects}")
+    project_ids = insert_chunks(Project, projects, lambda i: {
+        "title": f"{words[rng.randrange(POOL_SIZE)]} {words[rng.randrange(POOL_SIZE)]} {suffix + i}"[:80],
+        "description": sentences[rng.randrange(POOL_SIZE)],
+        "image": f"https://picsum.photos/seed/{suffix + i}/640/360",
+        "user_id": user_ids[project_owners[i]],
+        "created_at": timestamp(project_created[i]),
+        "updated_at": timestamp(project_created[i]),
+        "bookmark_count": bookmark_counts[i],
+        "comment_count": comment_counts[i],
+    }, chunk_size)
+
+    project_skills = []
+    if skill_rank:
+        for project in range(projects):
+            picked = set(skill_rank.sample(rng.randint(1, min(MAX_SKILLS_PER_PROJECT, skills))))
+            project_skills.extend((project, skill) for skill in sorted(picked))
+    log(f"project_skills: {len(project_skills)}")
+    insert_chunks(ProjectSkill, len(project_skills), lambda i: {
+        "project_id": project_ids[project_skills[i][0]],
+        "skill_id": skill_ids[project_skills[i][1]],
+    }, chunk_size)
+
+    log(f"comments: {len(comment_targets)}")
+
+    def comment_row(i):
+        project, user = comment_targets[i]
+        created = timestamp(after(project_created[project]))
+        return {
+            "content": paragraphs[rng.randrange(POOL_SIZE)],
+            "project_id": project_ids[project],
+            "user_id": user_ids[user],
+            "created_at": created,
+            "updated_at": created,
+        }
+    insert_chunks(Comment, len(comment_targets), comment_row, chunk_size)
+
+    log(f"bookmarks: {len(bookmark_pairs)}")
+    insert_chunks(Bookmark, len(bookmark_pairs), lambda i: {
+        "project_id": project_ids[bookmark_pairs[i][0]],
+        "user_id": user_ids[bookmark_pairs[i][1]],
+        "created_at": timestamp(after(project_created[bookmark_pairs[i][0]])),
+    }, chunk_size)
+
+    return {
+        "users": len(user_ids),
+        "skills": len(skill_ids),
+        "projects": len(project_ids),
+        "project_skills": len(project_skills),
+        "comments": len(comment_targets),
+        "bookmarks": len(bookmark_pairs),
+    }
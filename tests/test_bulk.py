@@ -0,0 +1,52 @@
+from bulk import bulk_update
+from models import db, User, Project, ProjectSkill, Skill
+
+
+def add_projects(count):
+    db.session.add(User(username='owner', email='owner@example.com', role='user'))
+    db.session.flush()
+    db.session.add_all(Project(title=f'project {i}', description='description', image='image.jpg', user_id=1)
+                       for i in range(1, count + 1))
+    db.session.commit()
+
+
+def test_bulk_update_is_undone_by_a_rollback(app):
+    # The savepoint around the batch must sit inside the request's transaction
+    add_projects(3)
+    results = bulk_update(Project, [{'id': 1, 'title': 'renamed'}, {'id': 2, 'title': 'project 3'}], ('title',))
+    assert [result['status'] for result in results] == ['updated', 'conflict']
+    db.session.rollback()
+    assert db.session.get(Project, 1).title == 'project 1'
+
+    bulk_update(Project, [{'id': 1, 'title': 'renamed'}], ('title',))
+    db.session.rollback()
+    assert db.session.get(Project, 1).title == 'project 1'
+
+
+def test_bulk_insert_reports_missing_parents_per_item(client):
+    add_projects(1)
+    db.session.add(Skill(name='python', details='details'))
+    db.session.commit()
+    # SQLite leaves foreign keys unchecked unless asked; the in-memory test
+    # database has a single connection, so this applies to the request too
+    connection = db.engine.raw_connection()
+    connection.cursor().execute('PRAGMA foreign_keys=ON')
+
+    response = client.post('/projectskill/bulk', json=[
+        {'project_id': 1, 'skill_id': 1},
+        {'project_id': 99, 'skill_id': 1},
+        {'project_id': 1, 'skill_id': 1},
+    ])
+    assert response.status_code == 200
+    assert [result['status'] for result in response.get_json()['results']] == ['created', 'invalid', 'conflict']
+    assert response.get_json()['results'][1]['message'] == "Refers to a missing row"
+    assert db.session.query(ProjectSkill).count() == 1
+
+
+def test_bulk_insert_is_not_implemented_without_upserts(client, monkeypatch):
+    class Bind:
+        class dialect:
+            name = 'mysql'
+    monkeypatch.setattr(db.session, 'get_bind', lambda *args, **kwargs: Bind)
+    response = client.post('/skill/bulk', json=[{'name': 'python', 'details': 'details'}])
+    assert response.status_code == 501
@@ -0,0 +1,42 @@
+import time
+import pytest
+from cache import MemoryBackend, RedisBackend
+
+
+def fill(backend, count, ttl=300):
+    for i in range(count):
+        backend.set(f'projects:list?page={i}', ['body', 200], ttl)
+        backend.tag('projects:list', f'projects:list?page={i}', ttl)
+        backend.tag(f'projects:{i}', f'projects:list?page={i}', ttl)
+
+
+def test_memory_tags_forget_evicted_keys():
+    backend = MemoryBackend(maxsize=2)
+    fill(backend, 1100)
+    assert len(backend.entries) == 2
+    assert sum(len(keys) for keys in backend.tags.values()) == 4
+    assert len(backend.key_tags) == 2
+    assert backend.pop_tag('projects:list') == {'projects:list?page=1098', 'projects:list?page=1099'}
+    assert backend.key_tags == {'projects:list?page=1098': {'projects:1098'},
+                                'projects:list?page=1099': {'projects:1099'}}
+
+
+def test_memory_tags_forget_expired_keys():
+    backend = MemoryBackend()
+    fill(backend, 3, ttl=-1)
+    assert backend.get('projects:list?page=0') is None
+    assert 'projects:list?page=0' not in backend.tags['projects:list']
+    assert 'projects:0' not in backend.tags
+
+
+def test_redis_tag_sets_expire_and_drop_expired_keys():
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    backend = RedisBackend(client)
+    backend.tag('projects:list', 'old', 1)
+    time.sleep(1.1)
+    backend.tag('projects:list', 'new', 300)
+    name = 'portfoliopro:tagset:projects:list'
+    assert 0 < client.ttl(name) <= 300
+    assert backend.pop_tag('projects:list') == {'new'}
+    assert not client.exists(name)
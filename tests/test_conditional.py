@@ -0,0 +1,21 @@
+from models import db, User, Project
+
+
+def test_same_second_updates_change_the_item_etag(client):
+    db.session.add(User(username='owner', email='owner@example.com', role='user'))
+    db.session.flush()
+    db.session.add(Project(title='project', description='description', image='image.jpg', user_id=1))
+    db.session.commit()
+
+    assert client.put('/projects/1', json={'title': 'first title'}).status_code == 200
+    first = client.get('/projects/1')
+    # Within the same second as the first update, so updated_at does not move
+    assert client.put('/projects/1', json={'title': 'second title'}).status_code == 200
+
+    response = client.get('/projects/1', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != first.headers['ETag']
+    assert response.get_json()['title'] == 'second title'
+
+    response = client.get('/projects/1', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
@@ -0,0 +1,36 @@
+import pytest
+from events import MemoryBroker
+from models import db, User, Project, Comment
+
+
+class DownBroker(MemoryBroker):
+    # A broker whose every publish fails, as Redis does when it is unreachable
+    def listening(self, channel):
+        return True
+
+    def publish(self, channel, message):
+        raise ConnectionError("broker unreachable")
+
+
+@pytest.fixture
+def project(app):
+    db.session.add(User(username='owner', email='owner@example.com', role='user'))
+    db.session.flush()
+    db.session.add(Project(title='project', description='description', image='image.jpg', user_id=1))
+    db.session.commit()
+    app.extensions['events'] = DownBroker()
+    return 1
+
+
+def test_comment_is_created_when_the_broker_fails(client, project):
+    response = client.post('/comment', json={'user_id': 1, 'project_id': project, 'content': 'hello'})
+    assert response.status_code == 201
+    assert db.session.query(Comment).count() == 1
+
+
+def test_bookmark_toggles_when_the_broker_fails(client, project):
+    response = client.post('/bookmark', json={'user_id': 1, 'project_id': project, 'action': 'bookmark'})
+    assert response.status_code == 201
+    response = client.post('/bookmark', json={'user_id': 1, 'project_id': project, 'action': 'unbookmark'})
+    assert response.status_code == 200
+    assert db.session.get(Project, project).bookmark_count == 0
@@ -0,0 +1,18 @@
+from models import db, User, Project
+
+
+def test_failing_statements_are_counted_and_release_their_start_time(app, client):
+    db.session.add(User(username='owner', email='owner@example.com', role='user'))
+    db.session.flush()
+    db.session.add_all(Project(title=f'project {i}', description='description', image='image.jpg', user_id=1)
+                       for i in (1, 2))
+    db.session.commit()
+
+    # The batch UPDATE hits the unique title, then each row is retried alone
+    response = client.put('/projects/bulk', json=[{'id': 1, 'title': 'project 2'}])
+    assert response.json['results'][0]['status'] == 'conflict'
+
+    with db.engine.connect() as connection:
+        assert connection.info.get('metrics_started') == []
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'portfoliopro_query_errors_total{endpoint="ProjectBulkData",method="put",error="IntegrityError"} 2' in body
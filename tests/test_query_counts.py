@@ -0,0 +1,63 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from models import db, User, Project, Skill, ProjectSkill, Bookmark, Comment
+
+# Statements per listing call, from the validators to the page query. They
+# must not depend on how many rows there are or how many the page returns.
+LISTINGS = {
+    '/user': 2,
+    '/projects': 2,
+    '/projects?skill=skill1': 2,
+    '/skill': 2,
+    '/bookmark': 2,
+    '/bookmark?user_id=1': 2,
+    '/user/1/bookmarks': 2,
+    '/comment': 2,
+    '/comment?project_id=1': 2,
+    '/comment?user_id=1': 2,
+    '/projects/1/comments': 3,
+    '/projectskill': 2,
+    '/projectskill?project_id=1': 2,
+    '/projectskill?skill_id=1': 2,
+    '/projects/1/full': 3,
+}
+
+
+def populate(rows):
+    db.session.add_all(User(username=f'user{i}', email=f'user{i}@example.com', role='user') for i in range(1, rows + 1))
+    db.session.flush()
+    db.session.add_all(Project(title=f'project {i}', description='description', image='image.jpg', user_id=i)
+                       for i in range(1, rows + 1))
+    db.session.add_all(Skill(name=f'skill{i}', details='details') for i in range(1, rows + 1))
+    db.session.flush()
+    for i in range(1, rows + 1):
+        db.session.add(ProjectSkill(project_id=1, skill_id=i))
+        db.session.add(ProjectSkill(project_id=i, skill_id=1) if i > 1 else ProjectSkill(project_id=2, skill_id=2))
+        db.session.add(Bookmark(user_id=1, project_id=i))
+        db.session.add(Comment(user_id=i, project_id=1, content=f'comment {i}'))
+    db.session.commit()
+
+
+@contextmanager
+def counted(engine):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+
+@pytest.mark.parametrize('rows', [3, 120])
+@pytest.mark.parametrize('url', LISTINGS)
+def test_listing_query_count(app, client, url, rows):
+    populate(rows)
+    with counted(db.engine) as statements:
+        response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    assert len(statements) == LISTINGS[url], statements
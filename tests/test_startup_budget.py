@@ -0,0 +1,15 @@
+from startup_budget import BUDGET_MS, measure, problems
+
+
+def test_startup_within_budget():
+    # measure() imports app and calls create_app() in a fresh interpreter
+    total_ms, imports = measure()
+    assert problems(total_ms, imports) == []
+
+
+def test_problems_reports_eager_imports_and_slow_starts():
+    imports = [(50.0, 1, 'flask'), (80.0, 1, 'alembic')]
+    found = problems(BUDGET_MS + 1, imports)
+    assert len(found) == 2
+    assert found[0].startswith('alembic imported at startup')
+    assert 'over the' in found[1]
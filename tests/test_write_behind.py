@@ -0,0 +1,129 @@
+import json
+import pytest
+import write_behind
+from app import create_app
+from conftest import TestConfig
+from models import db, User, Project
+from write_behind import BufferState
+
+
+def write_lines(path, *entries):
+    path.write_text(''.join(json.dumps(entry) + '\n' for entry in entries))
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    # Batches handed to apply(); a raised error stands for an unreachable database
+    batches = []
+    monkeypatch.setattr(write_behind.atexit, 'register', lambda close: None)
+    monkeypatch.setattr(write_behind, 'apply', batches.append)
+    return batches
+
+
+@pytest.fixture
+def database_down(monkeypatch):
+    def down(batch):
+        raise RuntimeError("database unreachable")
+    monkeypatch.setattr(write_behind.atexit, 'register', lambda close: None)
+    monkeypatch.setattr(write_behind, 'apply', down)
+
+
+def test_replay_keeps_the_newest_line(app, tmp_path, applied):
+    spool = tmp_path / 'spool.jsonl'
+    write_lines(spool, {'user_id': 1, 'project_id': 2, 'bookmarked': True},
+                {'user_id': 1, 'project_id': 2, 'bookmarked': False})
+    state = BufferState(app, 60, 500, str(spool))
+    state.start()
+    assert applied == [{(1, 2): False}]
+    assert not spool.exists()
+    state.close()
+
+
+def test_failed_replay_rewrites_the_spool_until_a_flush_succeeds(app, tmp_path, monkeypatch, database_down):
+    spool = tmp_path / 'spool.jsonl'
+    write_lines(spool, {'user_id': 1, 'project_id': 2, 'bookmarked': True},
+                {'user_id': 1, 'project_id': 3, 'bookmarked': True},
+                {'user_id': 1, 'project_id': 2, 'bookmarked': False})
+    state = BufferState(app, 60, 500, str(spool))
+    state.start()
+    assert sorted((entry['project_id'], entry['bookmarked']) for entry in read_lines(spool)) == [(2, False), (3, True)]
+
+    # Toggled back before the database returns: nothing is left to write
+    assert state.toggle((1, 3), False, False)
+    state.close()
+    assert read_lines(spool) == [{'user_id': 1, 'project_id': 2, 'bookmarked': False}]
+
+    batches = []
+    monkeypatch.setattr(write_behind, 'apply', batches.append)
+    state = BufferState(app, 60, 500, str(spool))
+    state.start()
+    assert batches == [{(1, 2): False}]
+    assert not spool.exists()
+    state.close()
+
+
+def test_close_appends_to_a_spool_it_did_not_replay(app, tmp_path, database_down):
+    spool = tmp_path / 'spool.jsonl'
+    state = BufferState(app, 60, 500, str(spool))
+    state.start()
+    # Another worker shuts down with its own toggles after this one started
+    write_lines(spool, {'user_id': 5, 'project_id': 6, 'bookmarked': True})
+    state.toggle((1, 2), True, False)
+    state.close()
+    assert read_lines(spool) == [{'user_id': 5, 'project_id': 6, 'bookmarked': True},
+                                 {'user_id': 1, 'project_id': 2, 'bookmarked': True}]
+
+
+def test_unreadable_spool_lines_are_skipped(app, tmp_path, applied):
+    spool = tmp_path / 'spool.jsonl'
+    spool.write_text('{"user_id": 1, "project_id": 2, "bookmarked": true}\n{"user_id": 1, "proj\n')
+    state = BufferState(app, 60, 500, str(spool))
+    state.start()
+    assert applied == [{(1, 2): True}]
+    state.close()
+
+
+def test_flusher_starts_when_replay_fails(app, tmp_path, applied):
+    spool = tmp_path / 'spool.jsonl'
+    spool.mkdir()
+    state = BufferState(app, 60, 500, str(spool))
+    state.start()
+    assert state.thread.is_alive()
+    state.close()
+    state.thread.join(1)
+    assert not state.thread.is_alive()
+
+
+@pytest.mark.parametrize('write_behind_on', [False, True])
+def test_bookmarks_of_missing_users_or_projects_are_404(write_behind_on, tmp_path):
+    class Config(TestConfig):
+        BOOKMARK_WRITE_BEHIND = write_behind_on
+        BOOKMARK_SPOOL = str(tmp_path / 'spool.jsonl')
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='owner', email='owner@example.com', role='user'))
+        db.session.flush()
+        db.session.add(Project(title='project', description='description', image='image.jpg', user_id=1))
+        db.session.commit()
+        client = app.test_client()
+
+        response = client.post('/bookmark', json={'user_id': 1, 'project_id': 99, 'action': 'bookmark'})
+        assert (response.status_code, response.get_json()) == (404, {"message": "Project not found"})
+        response = client.post('/bookmark', json={'user_id': 42, 'project_id': 1, 'action': 'bookmark'})
+        assert (response.status_code, response.get_json()) == (404, {"message": "User not found"})
+        response = client.post('/bookmark', json={'user_id': 1, 'project_id': 1, 'action': 'bookmark'})
+        assert response.status_code == (202 if write_behind_on else 201)
+
+        # The in-memory database has one connection, so the test's session
+        # has to end before the buffer can write through its own
+        db.session.remove()
+        if write_behind_on:
+            app.extensions['bookmark_buffer'].close()
+            assert db.session.query(Project.bookmark_count).scalar() == 1
+            db.session.remove()
+        db.drop_all()
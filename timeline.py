@@ -0,0 +1,45 @@
+from flask import request
+from models import Comment
+from pagination import build_page, encode_cursor, page_statement
+from schemas import comment_schema
+
+# A project's comments with the commenter's username, read off
+# ix_comments_project_id_created_at_id. Without `since` pages go newest
+# first and `cursor` walks back in time; the first page also returns a
+# `since` token for its newest comment. With `since` only the comments
+# posted after that token come back, oldest first, and the response carries
+# the token to poll with next, so clients never re-download the thread.
+
+TIMELINE_FIELDS = ("id", "user_id", "username", "content", "created_at", "updated_at")
+NEWEST_FIRST = [(Comment.created_at, True), (Comment.id, True)]
+OLDEST_FIRST = [(Comment.created_at, False), (Comment.id, False)]
+
+
+def timeline_query(project_id):
+    query, serialize = comment_schema.listing(*TIMELINE_FIELDS)
+    return query.filter(Comment.project_id == project_id), serialize
+
+
+def since_token(row):
+    return encode_cursor([row.created_at.isoformat(), row.id])
+
+
+def timeline_page(project_id):
+    query, serialize = timeline_query(project_id)
+    since = request.args.get('since')
+
+    if since:
+        # The token has the same shape as a cursor, so it seeks like one
+        args = dict(request.args.items(), cursor=since)
+        query, order, limit = page_statement(query, Comment, OLDEST_FIRST, args)
+        rows = query.all()
+        page = build_page(rows, order, limit, serialize)
+        page["since"] = since_token(rows[:limit][-1]) if rows else since
+        return page
+
+    query, order, limit = page_statement(query, Comment, NEWEST_FIRST)
+    rows = query.all()
+    page = build_page(rows, order, limit, serialize)
+    if not request.args.get('cursor'):
+        page["since"] = since_token(rows[0]) if rows else None
+    return page
@@ -0,0 +1,291 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from functools import wraps
+from flask import current_app, request
+from sqlalchemy import delete, exists, select, tuple_
+from bulk import dialect_insert
+from cache import cache
+from changes import changes
+from counters import bump
+from events import events
+from feeds import as_id, bookmark_feeds
+from models import db, Bookmark, Project, User
+
+# Optional write-behind for bookmark toggles (BOOKMARK_WRITE_BEHIND). A toggle
+# is checked against the buffered state, then the table, and acknowledged
+# with 202 without a transaction. The buffer keeps one entry per
+# (user_id, project_id) holding the state to write; a toggle back removes
+# the entry, so rapid on/off clicks never reach the database. A background
+# thread applies the buffer in one transaction every BOOKMARK_FLUSH_INTERVAL
+# seconds, or sooner once BOOKMARK_FLUSH_SIZE entries are waiting. Bookmark
+# reads flush first, so users always see their own toggles. On shutdown the
+# buffer is flushed, or spooled to BOOKMARK_SPOOL and replayed on the next start.
+
+logger = logging.getLogger('portfoliopro.write_behind')
+
+
+def apply(batch):
+    # One transaction for the whole batch; the insert skips pairs that exist
+    # and the delete pairs that are gone, so replaying a batch is harmless
+    adds = [key for key, on in batch.items() if on]
+    removes = [key for key, on in batch.items() if not on]
+    created, deleted, deltas = [], [], {}
+
+    if adds:
+        # Pairs whose user or project was deleted meanwhile are dropped, one
+        # stale toggle must not keep the rest of the batch from committing
+        user_ids = set(db.session.scalars(select(User.id).where(User.id.in_({user_id for user_id, _ in adds}))))
+        project_ids = set(db.session.scalars(select(Project.id).where(Project.id.in_({project_id for _, project_id in adds}))))
+        adds = [{'user_id': user_id, 'project_id': project_id} for user_id, project_id in adds
+                if user_id in user_ids and project_id in project_ids]
+    if adds:
+        stmt = dialect_insert(Bookmark).on_conflict_do_nothing().returning(Bookmark.id, Bookmark.project_id)
+        for row in db.session.execute(stmt, adds):
+            created.append(row.id)
+            deltas[row.project_id] = deltas.get(row.project_id, 0) + 1
+    if removes:
+        stmt = (delete(Bookmark).where(tuple_(Bookmark.user_id, Bookmark.project_id).in_(removes))
+                .returning(Bookmark.id, Bookmark.project_id))
+        for row in db.session.execute(stmt):
+            deleted.append(row.id)
+            deltas[row.project_id] = deltas.get(row.project_id, 0) - 1
+
+    counts = {project_id: bump(Project.bookmark_count, project_id, delta)
+              for project_id, delta in deltas.items() if delta}
+    changes.record('bookmarks', 'created', *created)
+    changes.record('bookmarks', 'deleted', *deleted)
+    db.session.commit()
+
+    cache.invalidate('projects', *deltas)
+    bookmark_feeds.forget_users(*{user_id for user_id, _ in batch})
+    for project_id, count in counts.items():
+        events.bookmarks_changed(project_id, count)
+
+
+def missing_parent(user_id, project_id):
+    # The 404 for a bookmark whose user or project does not exist, or None;
+    # one query, shared with the synchronous path in app.py
+    user, project = db.session.query(exists().where(User.id == user_id), exists().where(Project.id == project_id)).one()
+    if not user:
+        return {"message": "User not found"}, 404
+    if not project:
+        return {"message": "Project not found"}, 404
+    return None
+
+
+class BufferState:
+    # Pending toggles of one app and the thread that flushes them
+
+    def __init__(self, app, interval, size, spool):
+        self.app = app
+        self.interval = interval
+        self.size = size
+        self.spool = spool
+        self.pending = {}
+        self.flushing = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.flush_lock = threading.Lock()
+        self.thread = None
+        self.closed = False
+        # True while the spool file holds toggles this buffer has taken over,
+        # so it is rewritten from the buffer and removed after a flush; other
+        # workers sharing the path only ever append to it
+        self.spooled = False
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name='bookmark-write-behind', daemon=True)
+        atexit.register(self.close)
+        # Toggles spooled by the last shutdown go first, before anything reads;
+        # if they cannot be read the flusher still has to run
+        try:
+            self.replay()
+        except Exception:
+            logger.exception("Failed to replay bookmark spool %s", self.spool)
+        self.thread.start()
+
+    def buffered(self, key):
+        # The state a key will have once everything buffered is written, or None
+        with self.lock:
+            return self.pending.get(key, self.flushing.get(key))
+
+    def has_user(self, user_id):
+        with self.lock:
+            return any(user_id is None or key[0] == user_id for key in (*self.pending, *self.flushing))
+
+    def toggle(self, key, on, current):
+        # False when the key is already in that state; current is the stored
+        # state, used only when nothing is buffered for the key
+        with self.lock:
+            if self.pending.get(key, self.flushing.get(key, current)) == on:
+                return False
+            if key in self.pending:
+                del self.pending[key]
+            else:
+                self.pending[key] = on
+            if len(self.pending) >= self.size:
+                self.wake.notify()
+            return True
+
+    def run(self):
+        while True:
+            with self.lock:
+                if not self.closed and len(self.pending) < self.size:
+                    self.wake.wait(self.interval)
+                if self.closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        # True once nothing that was buffered is left unwritten
+        with self.flush_lock:
+            if not self.write_pending():
+                return False
+            if self.spooled:
+                # Every spooled toggle is now written, or was toggled back
+                self.spooled = False
+                if os.path.exists(self.spool):
+                    os.remove(self.spool)
+            return True
+
+    def write_pending(self):
+        with self.lock:
+            if not self.pending:
+                return True
+            self.flushing, self.pending = self.pending, {}
+        try:
+            with self.app.app_context():
+                apply(self.flushing)
+        except Exception:
+            logger.exception("Failed to write %d buffered bookmark toggle(s)", len(self.flushing))
+            with self.lock:
+                # A toggle made since the swap was relative to the batch and undoes it
+                for key, on in self.flushing.items():
+                    if key in self.pending:
+                        del self.pending[key]
+                    else:
+                        self.pending[key] = on
+                self.flushing = {}
+            return False
+        with self.lock:
+            self.flushing = {}
+        return True
+
+    def replay(self):
+        if not os.path.exists(self.spool):
+            return
+        spooled = {}
+        with open(self.spool) as spool:
+            for number, line in enumerate(spool, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    # Workers append, so later lines are newer
+                    spooled[(entry['user_id'], entry['project_id'])] = entry['bookmarked']
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Skipping unreadable line %d of %s", number, self.spool)
+        with self.lock:
+            for key, on in spooled.items():
+                # Toggles made by this process are newer than the spool
+                self.pending.setdefault(key, on)
+            self.spooled = True
+        if self.flush():
+            logger.info("Replayed %d spooled bookmark toggle(s)", len(spooled))
+        else:
+            # The flusher keeps retrying; until then the spool holds the merged buffer
+            self.write_spool()
+
+    def write_spool(self):
+        with self.lock:
+            lines = [json.dumps({'user_id': user_id, 'project_id': project_id, 'bookmarked': on})
+                     for (user_id, project_id), on in self.pending.items()]
+        # A spool this buffer took over is replaced by it; otherwise another
+        # worker's toggles may be waiting there, so they are kept
+        with open(self.spool, 'w' if self.spooled else 'a') as spool:
+            spool.write(''.join(line + '\n' for line in lines))
+        logger.warning("Spooled %d bookmark toggle(s) to %s", len(lines), self.spool)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.wake.notify()
+        if not self.flush():
+            self.write_spool()
+
+
+class BookmarkBuffer:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('BOOKMARK_WRITE_BEHIND', False)
+        app.config.setdefault('BOOKMARK_FLUSH_INTERVAL', 0.5)
+        app.config.setdefault('BOOKMARK_FLUSH_SIZE', 500)
+        app.config.setdefault('BOOKMARK_SPOOL', None)
+
+        state = None
+        if app.config['BOOKMARK_WRITE_BEHIND']:
+            spool = app.config['BOOKMARK_SPOOL'] or os.path.join(app.instance_path, 'bookmark-spool.jsonl')
+            state = BufferState(app, float(app.config['BOOKMARK_FLUSH_INTERVAL']),
+                                int(app.config['BOOKMARK_FLUSH_SIZE']), spool)
+        app.extensions['bookmark_buffer'] = state
+
+    @property
+    def state(self):
+        return current_app.extensions['bookmark_buffer']
+
+    @property
+    def enabled(self):
+        return self.state is not None
+
+    def toggle(self, user_id, project_id, on):
+        # Validated like the synchronous path, answered before anything is written
+        user_id, project_id = as_id(user_id), as_id(project_id)
+        if user_id is None or project_id is None:
+            return {"message": "'user_id' and 'project_id' must be integers"}, 400
+
+        if on:
+            # apply() would drop it later; the client has to hear now
+            missing = missing_parent(user_id, project_id)
+            if missing is not None:
+                return missing
+
+        state = self.state
+        state.start()
+        key = (user_id, project_id)
+        current = state.buffered(key)
+        if current is None:
+            current = db.session.query(Bookmark.id).filter_by(user_id=user_id, project_id=project_id).first() is not None
+
+        if not state.toggle(key, on, current):
+            if on:
+                return {"message": "This project is already bookmarked by the user"}, 400
+            return {"message": "Bookmark not found"}, 404
+        if on:
+            return {"message": f"Project {project_id} bookmarked by user {user_id}"}, 202
+        return {"message": f"Bookmark for project {project_id} by user {user_id} deleted"}, 202
+
+    def settled(self, get):
+        # Decorator for bookmark reads: writes out the user's buffered toggles
+        # first (everyone's when the read is not per user)
+        @wraps(get)
+        def wrapper(*args, **kwargs):
+            state = self.state
+            if state is not None:
+                state.start()
+                if state.has_user(as_id(kwargs.get('user_id', request.args.get('user_id')))):
+                    state.flush()
+            return get(*args, **kwargs)
+        return wrapper
+
+
+bookmark_buffer = BookmarkBuffer()